@@ -0,0 +1 @@
+# Empty file to make the benchmarks folder a package 
\ No newline at end of file
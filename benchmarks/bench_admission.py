@@ -0,0 +1,71 @@
+import asyncio
+import os
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.bench_concurrency import PET, distinct_pet
+from benchmarks.ollama_stub import OllamaStub
+from llm import PetNutritionLLM
+from llm_admission import AdmissionController, AdmissionRejected
+
+# A burst of distinct requests against a server that generates two at a time.
+# Without a bound every request waits in Ollama's queue and the tail grows
+# with the burst; with admission control the excess is rejected right away
+# and the requests that are accepted keep a short tail.
+
+BURST: int = 100
+
+
+def percentile(values: List[float], p: float) -> float:
+    ordered: List[float] = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+async def run_burst(llm: PetNutritionLLM) -> Dict:
+    latencies: List[float] = []
+    rejections: List[float] = []
+    retry_after: List[int] = []
+
+    async def one(i: int) -> None:
+        started: float = time.perf_counter()
+        try:
+            await llm.agenerate_meal_plan(pet_data=distinct_pet(i), use_cache=False)
+            latencies.append(time.perf_counter() - started)
+        except AdmissionRejected as rejected:
+            rejections.append(time.perf_counter() - started)
+            retry_after.append(rejected.retry_after)
+
+    await asyncio.gather(*[one(i) for i in range(BURST)])
+    return {
+        "accepted": len(latencies),
+        "rejected": len(rejections),
+        "p50": percentile(latencies, 0.5),
+        "p99": percentile(latencies, 0.99),
+        "rejectMs": max(rejections) * 1000 if rejections else 0.0,
+        "retryAfter": f"{min(retry_after)}-{max(retry_after)}s" if retry_after else "-",
+    }
+
+
+async def main() -> None:
+    stub = OllamaStub(latency=0.2, parallel=2).start()
+
+    unbounded = PetNutritionLLM(base_url=stub.url, admission=AdmissionController(max_in_flight=BURST, max_queue=0))
+    bounded = PetNutritionLLM(base_url=stub.url, admission=AdmissionController(max_in_flight=4, max_queue=8))
+    # Let the bounded controller observe the service time first
+    for i in range(4):
+        await bounded.agenerate_meal_plan(pet_data=dict(PET, weight=200 + i), use_cache=False)
+
+    print(f"{'admission':>10} {'accepted':>9} {'rejected':>9} {'p50 s':>7} {'p99 s':>7} {'reject ms':>10} {'retry after':>12}")
+    for name, llm in (("none", unbounded), ("4 + 8", bounded)):
+        result: Dict = await run_burst(llm)
+        print(f"{name:>10} {result['accepted']:>9} {result['rejected']:>9} {result['p50']:>7.2f} {result['p99']:>7.2f} "
+              f"{result['rejectMs']:>10.1f} {result['retryAfter']:>12}")
+
+    stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,26 @@
+import os
+import sys
+import timeit
+from typing import Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.bench_concurrency import PET
+from breed_profiles import BREED_TABLE, format_breed_profile
+from calorie_engine import CalorieEngine
+
+# Per-request cost of looking up the breed metadata, computing the calorie
+# band and feeding notes, and rendering them for the prompt.
+
+ITERATIONS: int = 20000
+
+
+if __name__ == "__main__":
+    engine = CalorieEngine()
+    print(f"{len(BREED_TABLE)} breeds")
+    for breed in ("Labrador Retriever", "Pug", "Mix Breed"):
+        pet: Dict = dict(PET, breed=breed)
+        seconds: float = timeit.timeit(
+            lambda: format_breed_profile(BREED_TABLE.profile(pet, engine)), number=ITERATIONS
+        )
+        print(f"{breed:>20}: {seconds / ITERATIONS * 1e6:6.1f} us/request")
@@ -0,0 +1,36 @@
+import os
+import sys
+import timeit
+from typing import Dict, Set
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.bench_concurrency import PET
+from llm_validation import CAT_BREEDS, DOG_BREEDS, PetDataValidator
+
+# Per-request cost of breed validation: the old validator, rebuilt per
+# request and title-casing every breed on every call, versus the breed
+# index built once at import; plus the cost of a "did you mean" lookup.
+
+ITERATIONS: int = 20000
+
+
+def legacy_validate(pet_data: Dict) -> bool:
+    dog_breeds: Set[str] = set(DOG_BREEDS)
+    cat_breeds: Set[str] = set(CAT_BREEDS)
+    breed: str = pet_data["breed"].strip().title()
+    normalized_dog_breeds: Set[str] = {breed.title() for breed in dog_breeds}
+    normalized_cat_breeds: Set[str] = {breed.title() for breed in cat_breeds}
+    if pet_data["species"].lower().strip() == "dog":
+        return breed in normalized_dog_breeds
+    return breed in normalized_cat_breeds
+
+
+if __name__ == "__main__":
+    validator = PetDataValidator()
+    pet: Dict = dict(PET, breed="labrador retriever", species="dog")
+    for name, validate in (("rebuilt per request", legacy_validate), ("breed index", validator.validate_pet_data)):
+        seconds: float = timeit.timeit(lambda: validate(pet), number=ITERATIONS)
+        print(f"{name:>20}: {seconds / ITERATIONS * 1e6:7.1f} us/request")
+    seconds = timeit.timeit(lambda: validator.suggest_breed("Labradr Retrever", "dog"), number=ITERATIONS)
+    print(f"{'did you mean':>20}: {seconds / ITERATIONS * 1e6:7.1f} us/lookup")
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import httpx
+from benchmarks.bench_concurrency import PET
+from benchmarks.ollama_stub import OllamaStub
+
+# Cold start of the app: time from launching the server process until it
+# answers requests, and until /ready reports the model resident. The stub
+# takes LOAD_DELAY seconds to "load" the model on its first request, which
+# the warm-up pays instead of the first meal plan request.
+
+PORT: int = 8811
+LOAD_DELAY: float = 5.0
+
+
+def wait_for(client: httpx.Client, path: str, started: float) -> float:
+    while True:
+        try:
+            if client.get(path).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.TransportError:
+            pass
+        time.sleep(0.02)
+
+
+if __name__ == "__main__":
+    stub = OllamaStub(latency=0.5, load_delay=LOAD_DELAY).start()
+    root: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    with tempfile.TemporaryDirectory() as directory:
+        env: Dict[str, str] = dict(
+            os.environ, OLLAMA_BASE_URLS=stub.url, DATABASE_URL=f"sqlite:///{directory}/recipes.db",
+            # Checked by main.py, the benchmark serves plain HTTP
+            SSL_KEYFILE="unused", SSL_CERTFILE="unused"
+        )
+        started: float = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--log-level", "warning"],
+            cwd=root, env=env
+        )
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{PORT}", timeout=60) as client:
+                serving: float = wait_for(client, "/", started)
+                ready: float = wait_for(client, "/ready", started)
+                startup: Dict = client.get("/ready").json()["startup"]
+                request_started: float = time.perf_counter()
+                client.post("/nutrition/get_meal_guidelines", json=PET)
+                first_request: float = time.perf_counter() - request_started
+        finally:
+            server.terminate()
+            server.wait()
+    stub.stop()
+
+    print(f"model load time (stub): {LOAD_DELAY:.2f} s")
+    print(f"cold start, launch to serving: {serving:.2f} s")
+    print(f"  module imports: {startup['importSeconds']:.2f} s, LLM client: {startup['clientSeconds']:.2f} s")
+    print(f"time to ready, launch to model resident: {ready:.2f} s")
+    print(f"  warm-up: {startup['warmupSeconds']:.2f} s")
+    print(f"first meal plan request after ready: {first_request:.2f} s")
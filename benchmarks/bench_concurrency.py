@@ -0,0 +1,78 @@
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.ollama_stub import OllamaStub
+from llm import PetNutritionLLM
+from llm_cache import WEIGHT_BAND_RATIO
+
+# Compares a blocking chain call (made from a coroutine, as the route used
+# to do) with agenerate_meal_plan at increasing concurrency.
+
+PET: Dict = {
+    "name": "Rex",
+    "breed": "Labrador Retriever",
+    "gender": "Male",
+    "species": "dog",
+    "age": 4,
+    "weight": 30,
+    "activity_level": "Medium",
+    "health_concerns": "None",
+}
+
+REQUESTS_PER_LEVEL: int = 16
+
+
+def distinct_pet(index: int) -> Dict:
+    # Each index a weight band apart, so no two pets share a cached plan or
+    # get coalesced into one generation
+    return dict(PET, weight=round(5 * WEIGHT_BAND_RATIO ** index, 2))
+
+
+async def run_blocking(llm: PetNutritionLLM, concurrency: int) -> float:
+    async def one(index: int) -> str:
+        pet_data: Dict = llm.validator.validate_pet_data(distinct_pet(index))
+        inputs, _metadata = llm._prompt_inputs(pet_data, llm.calorie_engine.calculate(pet_data))
+        return llm.pool.backends[0].chain.invoke(inputs)
+
+    return await run_level(one, concurrency)
+
+
+async def run_async(llm: PetNutritionLLM, concurrency: int) -> float:
+    async def one(index: int) -> Dict:
+        return await llm.agenerate_meal_plan(pet_data=distinct_pet(index), use_cache=False)
+
+    return await run_level(one, concurrency)
+
+
+async def run_level(one, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(index: int) -> Any:
+        async with semaphore:
+            return await one(index)
+
+    started: float = time.perf_counter()
+    await asyncio.gather(*[limited(index) for index in range(REQUESTS_PER_LEVEL)])
+    return REQUESTS_PER_LEVEL / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    stub = OllamaStub(latency=0.25).start()
+    llm = PetNutritionLLM(base_url=stub.url)
+
+    print(f"{'concurrency':>12} {'blocking req/s':>16} {'async req/s':>14}")
+    for concurrency in (1, 2, 4, 8, 16):
+        blocking: float = await run_blocking(llm, concurrency)
+        non_blocking: float = await run_async(llm, concurrency)
+        print(f"{concurrency:>12} {blocking:>16.2f} {non_blocking:>14.2f}")
+
+    stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
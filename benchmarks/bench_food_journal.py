@@ -0,0 +1,69 @@
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.bench_concurrency import PET
+from benchmarks.ollama_stub import OllamaStub
+from food_journal import summarize_food_journal
+from llm import PetNutritionLLM
+from llm_budget import estimate_tokens
+
+# Aggregation time and prompt size for growing food journals. The raw log
+# is what used to be pasted into the prompt line by line; the summary is
+# what goes in now.
+
+JOURNAL_SIZES: List[int] = [10, 100, 1000, 10000, 50000]
+FOODS: List[str] = ["Chicken and rice kibble", "Salmon pate", "Beef jerky treat", "Boiled egg", "Pumpkin puree"]
+UNITS: List[str] = ["cup", "cup", "g", "can", "tbsp"]
+
+
+def make_journal(entries: int) -> List[Dict]:
+    start: datetime = datetime(2024, 1, 1, 7, 0)
+    journal: List[Dict] = []
+    for i in range(entries):
+        food: int = i % 3 if i % 10 else 3 + i // 10 % 2
+        journal.append({
+            "dateTime": (start + timedelta(hours=8 * i, minutes=i % 7)).isoformat(),
+            "description": FOODS[food],
+            "quantity": 1 + i % 2 if UNITS[food] != "g" else 20,
+            "quantityUnit": UNITS[food],
+        })
+    return journal
+
+
+def raw_log(journal: List[Dict]) -> str:
+    return "\n".join(
+        f"- {entry['dateTime']}: {entry['description']} ({entry['quantity']} {entry['quantityUnit']})"
+        for entry in journal
+    )
+
+
+async def main() -> None:
+    # ~2,000 prompt tokens/s, roughly mistral:7b on a consumer GPU
+    stub = OllamaStub(latency=0.0, prompt_eval_per_token=0.0005).start()
+    llm = PetNutritionLLM(base_url=stub.url)
+
+    print(f"{'entries':>8} {'aggregate ms':>13} {'raw log tokens':>15} {'prompt tokens':>14} {'prompt eval ms':>15}")
+    for size in JOURNAL_SIZES:
+        journal: List[Dict] = make_journal(size)
+        started: float = time.perf_counter()
+        summarize_food_journal(journal)
+        aggregate_ms: float = (time.perf_counter() - started) * 1000
+
+        # Nothing reused from the KV cache, the whole prompt is evaluated
+        stub.cached_prompt = ""
+        await llm.agenerate_meal_plan(pet_data=PET, food_journal=journal, use_cache=False)
+        prompt_eval: Dict = stub.prompt_evals[-1]
+        print(f"{size:>8} {aggregate_ms:>13.2f} {estimate_tokens(raw_log(journal)):>15} "
+              f"{prompt_eval['prompt_eval_count']:>14} {prompt_eval['duration'] * 1000:>15.1f}")
+
+    stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+import timeit
+from typing import Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from langchain_core.outputs import GenerationChunk, LLMResult
+from llm import OllamaStatsHandler
+from llm_metrics import (
+    CACHE_MISSES, PARSING_SECONDS, PROMPT_SECONDS, QUEUE_SECONDS, VALIDATION_SECONDS, render_metrics
+)
+
+# Cost the metrics add to one generated meal plan: the stage timings and
+# counters recorded along the way, and the Ollama stats taken from the
+# answer by the callback handler. Also times rendering /metrics.
+
+ITERATIONS: int = 100000
+
+OLLAMA_STATS: Dict = {
+    "done": True, "done_reason": "stop", "prompt_eval_count": 1650, "prompt_eval_duration": 1_200_000_000,
+    "eval_count": 640, "eval_duration": 14_500_000_000,
+}
+
+
+def record_stages() -> None:
+    for stage in (VALIDATION_SECONDS, PROMPT_SECONDS, QUEUE_SECONDS, PARSING_SECONDS):
+        started: float = time.perf_counter()
+        stage.observe(time.perf_counter() - started)
+    CACHE_MISSES.inc()
+
+
+if __name__ == "__main__":
+    handler = OllamaStatsHandler()
+    answer = LLMResult(generations=[[GenerationChunk(text="{}", generation_info=OLLAMA_STATS)]])
+
+    stages: float = timeit.timeit(record_stages, number=ITERATIONS) / ITERATIONS
+    ollama: float = timeit.timeit(lambda: handler.on_llm_end(answer), number=ITERATIONS) / ITERATIONS
+    print(f"stage timings and counters: {stages * 1e6:6.2f} us/request")
+    print(f"Ollama stats from the answer: {ollama * 1e6:6.2f} us/request")
+    print(f"total: {(stages + ollama) * 1e6:6.2f} us per meal plan")
+    rendering: float = timeit.timeit(render_metrics, number=1000) / 1000
+    print(f"rendering /metrics: {rendering * 1e6:6.1f} us")
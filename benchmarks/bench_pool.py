@@ -0,0 +1,55 @@
+import asyncio
+import os
+import socket
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.bench_concurrency import PET, distinct_pet
+from benchmarks.ollama_stub import OllamaStub
+from llm import PetNutritionLLM
+
+# Least-outstanding-requests balancing across several stand-in servers of
+# different speeds, one of which is down. The dead backend is ejected after
+# a few connection failures and its requests are retried elsewhere.
+
+REQUESTS: int = 60
+CONCURRENCY: int = 12
+
+
+def unused_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+async def main() -> None:
+    stubs: List[OllamaStub] = [
+        OllamaStub(latency=latency, parallel=2).start() for latency in (0.1, 0.2, 0.4)
+    ]
+    llm = PetNutritionLLM(base_url=[stub.url for stub in stubs] + [unused_url()])
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(i: int) -> Dict:
+        async with semaphore:
+            return await llm.agenerate_meal_plan(pet_data=distinct_pet(i), use_cache=False)
+
+    started: float = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(REQUESTS)])
+    elapsed: float = time.perf_counter() - started
+    print(f"{REQUESTS} requests in {elapsed:.2f}s ({REQUESTS / elapsed:.1f} req/s)\n")
+
+    print(f"{'backend':>24} {'requests':>9} {'failures':>9} {'ejected':>8} {'mean s':>7} {'ewma s':>7}")
+    for stats in llm.pool.stats():
+        mean = f"{stats['meanLatency']:.2f}" if stats["meanLatency"] else "-"
+        ewma = f"{stats['ewmaLatency']:.2f}" if stats["ewmaLatency"] else "-"
+        print(f"{stats['baseUrl']:>24} {stats['requests']:>9} {stats['failures']:>9} {str(stats['ejected']):>8} {mean:>7} {ewma:>7}")
+
+    for stub in stubs:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+import os
+import sys
+import timeit
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from langchain.prompts import ChatPromptTemplate
+from benchmarks.bench_concurrency import PET
+from calorie_engine import CalorieEngine
+from llm import PetNutritionLLM
+from recipe_titles import RecipeTitleIndex
+
+# Per-request CPU cost of turning pet data into the final prompt string:
+# formatting and re-parsing the whole template on every request (the old
+# generate_meal_plan) versus binding variables to the precompiled prompt.
+
+JOURNAL: List[Dict] = [
+    {"dateTime": f"2024-05-{day:02d}T08:00:00", "description": "Chicken and rice", "quantity": 1, "quantityUnit": "cup"}
+    for day in range(1, 29)
+]
+RECIPES: List[str] = ["Chicken and Rice Bowl", "Beef Stew", "Salmon Mash"]
+ITERATIONS: int = 2000
+TARGETS: Dict = CalorieEngine().calculate(PET)
+
+
+def legacy_prompt(llm: PetNutritionLLM, pet_data: Dict) -> str:
+    inputs, _metadata = llm._prompt_inputs(pet_data, TARGETS, JOURNAL, RecipeTitleIndex(RECIPES))
+    full_prompt: str = llm.template + llm.food_journal_template + llm.closing_instructions
+    full_prompt += llm.pet_details_template.format(**inputs)
+    prompt = ChatPromptTemplate.from_template(full_prompt)
+    return prompt.invoke({}).to_string()
+
+
+def compiled_prompt(llm: PetNutritionLLM, pet_data: Dict) -> str:
+    inputs, _metadata = llm._prompt_inputs(pet_data, TARGETS, JOURNAL, RecipeTitleIndex(RECIPES))
+    return llm.prompt.invoke(inputs).to_string()
+
+
+if __name__ == "__main__":
+    llm = PetNutritionLLM()
+    pet_data: Dict = llm.validator.validate_pet_data(PET)
+    assert legacy_prompt(llm, pet_data) == compiled_prompt(llm, pet_data)
+
+    for name, build in (("per-request template", legacy_prompt), ("precompiled prompt", compiled_prompt)):
+        seconds: float = timeit.timeit(lambda: build(llm, pet_data), number=ITERATIONS)
+        print(f"{name:>22}: {seconds / ITERATIONS * 1e6:8.1f} us/request")
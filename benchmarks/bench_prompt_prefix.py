@@ -0,0 +1,56 @@
+import asyncio
+import os
+import sys
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from langchain.prompts import ChatPromptTemplate
+from benchmarks.bench_concurrency import PET
+from benchmarks.ollama_stub import OllamaStub
+from llm import PetNutritionLLM
+from llm_schema import MEAL_PLAN_SCHEMA
+
+# Prompt-eval time per request when consecutive requests are for different
+# pets. The stand-in server only charges for tokens after the prefix shared
+# with the previous prompt, like Ollama's KV cache reuse.
+
+PETS: List[Dict] = [dict(PET, name=f"Pet {i}", weight=10 + i, age=1 + i % 9) for i in range(12)]
+
+
+async def run_layout(llm: PetNutritionLLM, stub: OllamaStub) -> Dict:
+    start: int = len(stub.prompt_evals)
+    for pet in PETS:
+        await llm.agenerate_meal_plan(pet_data=pet, use_cache=False)
+    # The first request of a layout always evaluates the whole prompt
+    evals: List[Dict] = stub.prompt_evals[start + 1:]
+    return {
+        "prompt_tokens": sum(e["prompt_eval_count"] for e in evals) / len(evals),
+        "evaluated_tokens": sum(e["evaluated"] for e in evals) / len(evals),
+        "prompt_eval_ms": sum(e["duration"] for e in evals) / len(evals) * 1000,
+    }
+
+
+async def main() -> None:
+    # ~2,000 prompt tokens/s, roughly mistral:7b on a consumer GPU
+    stub = OllamaStub(latency=0.0, prompt_eval_per_token=0.0005).start()
+
+    pet_first = PetNutritionLLM(base_url=stub.url)
+    legacy_prompt = ChatPromptTemplate.from_template(
+        pet_first.pet_details_template + pet_first.template + pet_first.food_journal_template + pet_first.closing_instructions
+    )
+    for backend in pet_first.pool.backends:
+        backend.chain = legacy_prompt | backend.model.bind(format=MEAL_PLAN_SCHEMA)
+
+    static_first = PetNutritionLLM(base_url=stub.url)
+
+    print(f"{'layout':>18} {'prompt tokens':>14} {'evaluated':>10} {'prompt eval ms':>15}")
+    for name, llm in (("pet data first", pet_first), ("static prefix", static_first)):
+        result: Dict = await run_layout(llm, stub)
+        print(f"{name:>18} {result['prompt_tokens']:>14.0f} {result['evaluated_tokens']:>10.0f} {result['prompt_eval_ms']:>15.1f}")
+
+    stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.bench_concurrency import PET
+from benchmarks.ollama_stub import OllamaStub
+from breed_profiles import BREED_TABLE
+from calorie_engine import CalorieEngine
+from llm import PetNutritionLLM
+from recipe_library import RecipeLibrary, profile_tags
+
+# Recipe lookup latency in a library of LIBRARY_SIZE recipes spread over
+# PROFILES pet profiles, and meal plan latency when the recipes are
+# generated versus served from the library.
+
+LIBRARY_SIZE: int = 20000
+LOOKUPS: int = 200
+TOKEN_DELAY: float = 0.02
+RUNS: int = 3
+
+FOODS: List[str] = [
+    "chicken breast", "turkey", "salmon", "beef", "lamb", "rabbit", "white rice", "brown rice", "sweet potatoes",
+    "pumpkin", "carrots", "green beans", "peas", "spinach", "blueberries", "oats", "eggs", "cottage cheese",
+]
+# PET's profile first, then the same dog at other ages and with other
+# health concerns
+PROFILES: List[Dict] = [
+    profile_tags(pet, BREED_TABLE.profile(pet, CalorieEngine())) for pet in (
+        PET, dict(PET, age=0.3), dict(PET, age=9), dict(PET, health_concerns="Overweight"),
+        dict(PET, health_concerns="Chicken allergy"), dict(PET, health_concerns="Kidney disease"),
+    )
+]
+
+
+def fill(library: RecipeLibrary) -> None:
+    rng = random.Random(1)
+    recipes: List[Dict] = [{
+        "recipeName": f"Recipe {i} with {' and '.join(foods)}",
+        "ingredients": foods,
+        "preparation": ["Cook everything", "Let it cool"],
+        "description": "Benchmark recipe",
+    } for i, foods in ((i, rng.sample(FOODS, 4)) for i in range(LIBRARY_SIZE))]
+    for start in range(0, LIBRARY_SIZE, 1000):
+        library.add("dog", recipes[start:start + 1000], PROFILES[start // 1000 % len(PROFILES)])
+
+
+async def plan_latency(llm: PetNutritionLLM) -> float:
+    started: float = time.perf_counter()
+    for run in range(RUNS):
+        await llm.agenerate_meal_plan(
+            pet_data=dict(PET, weight=10 + run),
+            food_journal=[{"description": "Chicken breast", "quantity": 1, "quantityUnit": "cup"}],
+            use_cache=False
+        )
+    return (time.perf_counter() - started) / RUNS
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        library = RecipeLibrary(f"sqlite:///{os.path.join(directory, 'recipes.db')}")
+        started: float = time.perf_counter()
+        fill(library)
+        print(f"stored {LIBRARY_SIZE} recipes in {time.perf_counter() - started:.1f} s")
+
+        rng = random.Random(2)
+        latencies: List[float] = []
+        for _ in range(LOOKUPS):
+            started = time.perf_counter()
+            library.find("dog", rng.sample(FOODS, 3), limit=2, tags=rng.choice(PROFILES), avoid=["Chicken allergy"])
+            latencies.append(time.perf_counter() - started)
+        latencies.sort()
+        print(f"lookup p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+
+        stub = OllamaStub(latency=0.05, token_delay=TOKEN_DELAY).start()
+        generated: float = await plan_latency(PetNutritionLLM(base_url=stub.url))
+        served: float = await plan_latency(PetNutritionLLM(base_url=stub.url, recipe_library=library))
+        print(f"meal plan, recipes generated: {generated:.2f} s")
+        print(f"meal plan, recipes from library: {served:.2f} s")
+        stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+import os
+import random
+import sys
+import timeit
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.bench_concurrency import PET
+from calorie_engine import CalorieEngine
+from llm import PetNutritionLLM
+from llm_budget import estimate_tokens
+from recipe_titles import RecipeTitleIndex
+
+# Prompt tokens spent on the user's saved recipe titles when every title is
+# inlined (the old prompt) versus only the closest TITLES_IN_PROMPT, and the
+# CPU cost of building the index and checking the generated titles.
+
+SAVED: List[int] = [10, 100, 500, 2000]
+ITERATIONS: int = 20
+
+PROTEINS: List[str] = ["Chicken", "Turkey", "Salmon", "Beef", "Lamb", "Rabbit", "Duck", "Venison", "Cod", "Egg"]
+SIDES: List[str] = ["Rice", "Sweet Potato", "Pumpkin", "Quinoa", "Barley", "Oats", "Peas", "Carrot", "Spinach"]
+DISHES: List[str] = ["Bowl", "Stew", "Mash", "Bake", "Casserole", "Skillet", "Medley", "Hash", "Patties"]
+
+
+def saved_titles(count: int) -> List[str]:
+    rng = random.Random(count)
+    return [f"{rng.choice(PROTEINS)} and {rng.choice(SIDES)} {rng.choice(DISHES)} {i}" for i in range(count)]
+
+
+if __name__ == "__main__":
+    llm = PetNutritionLLM()
+    targets = CalorieEngine().calculate(PET)
+    journal = [{"description": "Chicken breast", "quantity": 1, "quantityUnit": "cup"}]
+    generated: List[str] = ["Chicken & Rice Bowls", "Turkey Pumpkin Stew"]
+
+    print(f"{'saved':>6} {'inlined tokens':>15} {'indexed tokens':>15} {'index + check ms':>17}")
+    for count in SAVED:
+        titles: List[str] = saved_titles(count)
+        inlined: int = estimate_tokens(llm.existing_recipes_template.format(
+            existing_recipes=", ".join(f'"{title}"' for title in titles)
+        ))
+        inputs, _metadata = llm._prompt_inputs(PET, targets, journal, RecipeTitleIndex(titles))
+        indexed: int = estimate_tokens(inputs["existing_recipes_section"])
+
+        def check() -> None:
+            index = RecipeTitleIndex(titles)
+            for title in generated:
+                index.collision(title)
+
+        seconds: float = timeit.timeit(check, number=ITERATIONS) / ITERATIONS
+        print(f"{count:>6} {inlined:>15} {indexed:>15} {seconds * 1000:>17.2f}")
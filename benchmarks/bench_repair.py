@@ -0,0 +1,46 @@
+import asyncio
+import os
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.bench_concurrency import PET
+from benchmarks.ollama_stub import OllamaStub
+from llm import PetNutritionLLM
+
+# An answer cut off by the token limit used to fail the whole request, and
+# the client's retry generated the plan from scratch. Now the complete
+# sections are kept and only the missing ones are generated again.
+
+TOKEN_DELAY: float = 0.01
+
+
+async def main() -> None:
+    # ~100 tokens/s of generation
+    full = OllamaStub(latency=0.0, token_delay=TOKEN_DELAY).start()
+    llm = PetNutritionLLM(base_url=full.url)
+    started: float = time.perf_counter()
+    await llm.agenerate_meal_plan(pet_data=PET, use_cache=False)
+    full_seconds: float = time.perf_counter() - started
+    full_tokens: int = len(full.response_text) // 4 + 1
+    full.stop()
+
+    print(f"complete answer: {full_tokens} tokens in {full_seconds:.2f}s\n")
+    print(f"{'cut off at':>11} {'repaired s':>11} {'fail + retry s':>15}  repaired sections")
+    for share in (0.5, 0.8, 0.95):
+        stub = OllamaStub(latency=0.0, token_delay=TOKEN_DELAY, num_predict=int(full_tokens * share)).start()
+        llm = PetNutritionLLM(base_url=stub.url)
+        started = time.perf_counter()
+        meal_plan: Dict = await llm.agenerate_meal_plan(pet_data=PET, use_cache=False)
+        repair_seconds: float = time.perf_counter() - started
+        repaired: List[str] = meal_plan["metadata"]["repairedSections"]
+        # Failing and generating the whole plan again
+        regenerate_seconds: float = share * full_seconds + full_seconds
+        print(f"{share:>11.0%} {repair_seconds:>11.2f} {regenerate_seconds:>15.2f}  {', '.join(repaired)}")
+        stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
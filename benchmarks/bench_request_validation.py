@@ -0,0 +1,35 @@
+import os
+import sys
+import timeit
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.bench_concurrency import PET
+from routes.nutrition_models import MealPlanRequest
+
+# Per-request cost of validating a meal plan request body (pet, breed,
+# food journal and saved recipe titles) with the request models.
+
+JOURNAL_SIZES: List[int] = [0, 100, 1000, 10000]
+RECIPES: List[str] = [f"Saved recipe {i}" for i in range(50)]
+
+
+def payload(entries: int) -> Dict:
+    return {
+        **PET,
+        "breed": "labrador retriever",
+        "food_journal": [
+            {"dateTime": f"2024-05-{i % 28 + 1:02d}T08:00:00", "description": "Chicken and rice", "quantity": 1, "quantityUnit": "cup"}
+            for i in range(entries)
+        ],
+        "existing_recipes": RECIPES,
+    }
+
+
+if __name__ == "__main__":
+    for entries in JOURNAL_SIZES:
+        body: Dict = payload(entries)
+        number: int = max(10, 20000 // (entries + 1))
+        seconds: float = timeit.timeit(lambda: MealPlanRequest.model_validate(body).journal(), number=number)
+        print(f"{entries:>6} journal entries: {seconds / number * 1e6:9.1f} us/request")
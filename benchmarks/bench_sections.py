@@ -0,0 +1,47 @@
+import asyncio
+import os
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.bench_concurrency import PET
+from benchmarks.ollama_stub import OllamaStub
+from llm import PetNutritionLLM
+
+# Latency of one meal plan generated as a single answer and as parallel
+# section groups, on a server with several parallel slots (like
+# OLLAMA_NUM_PARALLEL=4) generating ~50 tokens/s per slot.
+
+TOKEN_DELAY: float = 0.02
+RUNS: int = 3
+
+
+async def measure(llm: PetNutritionLLM) -> Dict:
+    latencies: List[float] = []
+    first_sections: List[float] = []
+    for run in range(RUNS):
+        started: float = time.perf_counter()
+        first: float = 0.0
+        async for _section, _value in llm.astream_meal_plan(pet_data=dict(PET, weight=10 + run), use_cache=False):
+            first = first or time.perf_counter() - started
+        latencies.append(time.perf_counter() - started)
+        first_sections.append(first)
+    return {"latency": sum(latencies) / RUNS, "first": sum(first_sections) / RUNS}
+
+
+async def main() -> None:
+    stub = OllamaStub(latency=0.05, token_delay=TOKEN_DELAY, parallel=4).start()
+
+    print(f"{'mode':>18} {'first section s':>16} {'complete s':>11}")
+    for name, parallel_sections in (("single answer", False), ("parallel sections", True)):
+        llm = PetNutritionLLM(base_url=stub.url, parallel_sections=parallel_sections)
+        result: Dict = await measure(llm)
+        print(f"{name:>18} {result['first']:>16.2f} {result['latency']:>11.2f}")
+
+    stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+import asyncio
+import json
+import os
+import sys
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from benchmarks.bench_concurrency import PET
+from benchmarks.ollama_stub import OllamaStub
+from llm import PetNutritionLLM
+from llm_schema import MealPlanResponse
+from routes.serialization import encode_json, encode_msgpack
+
+# Per-response cost of encoding a meal plan the way FastAPI does by default
+# (jsonable_encoder, then json.dumps), as orjson bytes and as MessagePack,
+# for a single response and a 100 pet batch. Also times parsing the model
+# output.
+
+ITERATIONS: int = 5000
+BATCH_SIZE: int = 100
+
+
+def fastapi_default(content) -> bytes:
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+ENCODERS: List[Tuple[str, Callable]] = [
+    ("jsonable_encoder + json", fastapi_default),
+    ("orjson", encode_json),
+    ("msgpack", encode_msgpack),
+]
+
+
+async def meal_plan(stub: OllamaStub) -> Dict:
+    return await PetNutritionLLM(base_url=stub.url).agenerate_meal_plan(PET)
+
+
+def report(label: str, content, number: int) -> None:
+    print(label)
+    for name, encode in ENCODERS:
+        seconds: float = timeit.timeit(lambda: encode(content), number=number)
+        print(f"  {name:>24}: {seconds / number * 1e6:8.1f} us  {len(encode(content)):>7} bytes")
+
+
+if __name__ == "__main__":
+    stub = OllamaStub(latency=0.0).start()
+    response: Dict = asyncio.run(meal_plan(stub))
+    stub.stop()
+
+    report("single meal plan", response, ITERATIONS)
+    batch: List[Dict] = [{"index": index, "status": "ok", "data": response} for index in range(BATCH_SIZE)]
+    report(f"batch of {BATCH_SIZE}", batch, ITERATIONS // BATCH_SIZE)
+
+    print("parsing the model output")
+    text: str = stub.response_text
+    for name, parse in (
+        ("json.loads", json.loads),
+        ("orjson.loads", orjson.loads),
+        ("model_validate_json", MealPlanResponse.model_validate_json),
+    ):
+        seconds = timeit.timeit(lambda: parse(text), number=ITERATIONS)
+        print(f"  {name:>24}: {seconds / ITERATIONS * 1e6:8.1f} us")
@@ -0,0 +1,40 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.bench_concurrency import PET
+from benchmarks.ollama_stub import OllamaStub
+from llm import PetNutritionLLM
+
+# Time until the client has something to show: the full response for
+# agenerate_meal_plan versus the first section for astream_meal_plan.
+
+
+async def main() -> None:
+    stub = OllamaStub(latency=0.2, token_delay=0.005).start()
+    llm = PetNutritionLLM(base_url=stub.url)
+
+    started: float = time.perf_counter()
+    await llm.agenerate_meal_plan(pet_data=PET, use_cache=False)
+    full: float = time.perf_counter() - started
+
+    started = time.perf_counter()
+    first_section: float = 0.0
+    sections: int = 0
+    async for section, _ in llm.astream_meal_plan(pet_data=PET, use_cache=False):
+        sections += 1
+        if sections == 1:
+            first_section = time.perf_counter() - started
+    streamed: float = time.perf_counter() - started
+
+    print(f"agenerate_meal_plan: full response after {full:.2f}s")
+    print(f"astream_meal_plan:   first section after {first_section:.2f}s, {sections} sections in {streamed:.2f}s")
+
+    stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,272 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+# Minimal stand-in for the Ollama HTTP API, used by the benchmarks so they can
+# run without a GPU. It answers /api/generate with a canned meal plan after a
+# configurable delay and streams it token by token like the real server.
+
+SAMPLE_MEAL_PLAN: Dict = {
+    "caloricIntake": "1100 kcal",
+    "mealPlan": {
+        "breakfast": "7:00 AM - 150g chicken and brown rice",
+        "lunch": "12:00 PM - 80g turkey with pumpkin",
+        "dinner": "6:00 PM - 150g salmon with sweet potato",
+        "snacks": "2 small carrot sticks"
+    },
+    "nutritionBalance": {
+        "protein": "28%",
+        "fat": "16%",
+        "carbs": "40%",
+        "fiber": "4%",
+        "moisture": "12%"
+    },
+    "warnings": "No specific warnings for this pet",
+    "ingredients": [
+        {
+            "recipeName": "Chicken and Rice Bowl",
+            "ingredients": ["chicken breast", "brown rice", "carrots"],
+            "preparation": ["Boil the chicken", "Cook the rice", "Mix with steamed carrots"],
+            "description": "A gentle everyday meal. It is easy to digest and rich in lean protein."
+        },
+        {
+            "recipeName": "Salmon Sweet Potato Mash",
+            "ingredients": ["salmon", "sweet potato", "green beans"],
+            "preparation": ["Bake the salmon", "Mash the sweet potato", "Combine with chopped beans"],
+            "description": "An omega-3 rich dinner. The sweet potato adds gentle fiber."
+        }
+    ],
+    "feedingGuidelines": {
+        "frequency": "Three meals a day",
+        "portionControl": "Weigh each portion",
+        "waterIntake": "Around 1 liter per day",
+        "feedingTips": "Feed at consistent times"
+    },
+    "supplements": "No supplements required",
+    "foodsToAvoid": "Chocolate, grapes, onions, garlic",
+    "transitionGuidelines": "Mix new food with the old over 7 days"
+}
+
+# Titles the stub cycles through when asked for a single recipe
+RECIPE_NAMES: List[str] = [
+    "Turkey Pumpkin Stew", "Lamb and Barley Bake", "Beef Quinoa Skillet", "Rabbit Carrot Casserole",
+    "Duck and Pear Medley", "Venison Squash Hash",
+]
+
+SAMPLE_RECIPE: Dict = {
+    "recipeName": RECIPE_NAMES[0],
+    "ingredients": ["ground turkey", "pumpkin", "peas"],
+    "preparation": ["Brown the turkey", "Simmer with pumpkin and peas"],
+    "description": "A hearty stew for cooler days. Pumpkin keeps digestion regular."
+}
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class OllamaStub:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.5,
+                 token_delay: float = 0.0, parallel: Optional[int] = None,
+                 prompt_eval_per_token: float = 0.0, response: Optional[Dict] = None,
+                 num_predict: Optional[int] = None, load_delay: float = 0.0, stall_after: Optional[int] = None):
+        self.latency: float = latency
+        self.token_delay: float = token_delay
+        self.prompt_eval_per_token: float = prompt_eval_per_token
+        self.response: Dict = response or SAMPLE_MEAL_PLAN
+        self.response_text: str = json.dumps(self.response, indent=2)
+        # Answers longer than this many tokens are cut off, like Ollama's
+        # num_predict limit
+        self.num_predict: Optional[int] = num_predict
+        # Time the first request for a model takes to load it into memory;
+        # loaded models are listed by /api/ps
+        self.load_delay: float = load_delay
+        self.loaded_models: List[str] = []
+        # A backend that hangs: after this many tokens of the next answer
+        # nothing more is sent until the stub is stopped
+        self.stall_after: Optional[int] = stall_after
+        self.stopped: threading.Event = threading.Event()
+        self.slots: Optional[threading.Semaphore] = threading.Semaphore(parallel) if parallel else None
+        self.requests: int = 0
+        self.recipes_generated: int = 0
+        self.prompt_evals: List[Dict] = []
+        # "format" option of the last request, "json" or a JSON schema
+        self.last_format = None
+        # Last evaluated prompt, used to emulate Ollama's prompt (KV) cache reuse
+        self.cached_prompt: str = ""
+        self.lock: threading.Lock = threading.Lock()
+        self.server: ThreadingHTTPServer = _Server((host, port), self._handler())
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "OllamaStub":
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _prompt_eval(self, prompt: str) -> Dict:
+        # Tokens are approximated as 4 characters; only the part of the prompt
+        # after the prefix shared with the previous request has to be evaluated
+        with self.lock:
+            shared: int = 0
+            for a, b in zip(self.cached_prompt, prompt):
+                if a != b:
+                    break
+                shared += 1
+            self.cached_prompt = prompt
+        total_tokens: int = max(1, len(prompt) // 4)
+        evaluated_tokens: int = max(1, (len(prompt) - shared) // 4)
+        duration: float = evaluated_tokens * self.prompt_eval_per_token
+        prompt_eval: Dict = {"prompt_eval_count": total_tokens, "evaluated": evaluated_tokens, "duration": duration}
+        with self.lock:
+            self.prompt_evals.append(prompt_eval)
+        return prompt_eval
+
+    def _load(self, model: str) -> float:
+        with self.lock:
+            if model in self.loaded_models:
+                return 0.0
+            time.sleep(self.load_delay)
+            self.loaded_models.append(model)
+        return self.load_delay
+
+    def _response_text(self, response_format) -> str:
+        # A single recipe schema gets a recipe with the next title
+        if isinstance(response_format, dict) and "recipeName" in response_format.get("properties", {}):
+            with self.lock:
+                name: str = RECIPE_NAMES[self.recipes_generated % len(RECIPE_NAMES)]
+                self.recipes_generated += 1
+            return json.dumps(dict(SAMPLE_RECIPE, recipeName=name), indent=2)
+        # A schema asking for some of the sections only gets those
+        if isinstance(response_format, dict) and "properties" in response_format:
+            sections: Dict = {key: value for key, value in self.response.items() if key in response_format["properties"]}
+            if len(sections) < len(self.response):
+                return json.dumps(sections, indent=2)
+        return self.response_text
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, payload: Dict) -> None:
+                body: bytes = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _write_chunk(self, payload: Dict) -> None:
+                data: bytes = json.dumps(payload).encode() + b"\n"
+                self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_GET(self):
+                if self.path == "/api/version":
+                    self._send_json({"version": "0.0.0-stub"})
+                elif self.path == "/api/ps":
+                    self._send_json({"models": [{"name": model, "model": model} for model in stub.loaded_models]})
+                else:
+                    self._send_json({"models": []})
+
+            def do_POST(self):
+                length: int = int(self.headers.get("Content-Length", 0))
+                request: Dict = json.loads(self.rfile.read(length) or b"{}")
+                if self.path != "/api/generate":
+                    self._send_json({})
+                    return
+                model: str = request.get("model", "stub")
+                load_duration: float = stub._load(model)
+                if not request.get("prompt"):
+                    # No prompt: only load the model, like Ollama
+                    self._send_json({"model": model, "response": "", "done": True, "done_reason": "load",
+                                     "load_duration": int(load_duration * 1e9)})
+                    return
+
+                with stub.lock:
+                    stub.requests += 1
+                    stub.last_format = request.get("format")
+                    stall_after: Optional[int] = stub.stall_after
+                    stub.stall_after = None
+                if stub.slots:
+                    stub.slots.acquire()
+                try:
+                    started: float = time.perf_counter()
+                    prompt_eval: Dict = stub._prompt_eval(request.get("prompt", ""))
+                    time.sleep(prompt_eval["duration"] + stub.latency)
+                    response_text: str = stub._response_text(request.get("format"))
+                    tokens = [response_text[i:i + 4] for i in range(0, len(response_text), 4)]
+                    done_reason: str = "stop"
+                    if stub.num_predict is not None and len(tokens) > stub.num_predict:
+                        tokens = tokens[:stub.num_predict]
+                        done_reason = "length"
+                    final: Dict = {
+                        "model": model,
+                        "done": True,
+                        "done_reason": done_reason,
+                        "load_duration": int(load_duration * 1e9),
+                        "prompt_eval_count": prompt_eval["prompt_eval_count"],
+                        "prompt_eval_duration": int(prompt_eval["duration"] * 1e9),
+                        "eval_count": len(tokens),
+                        "eval_duration": int(len(tokens) * stub.token_delay * 1e9),
+                    }
+
+                    if request.get("stream", True) is False:
+                        time.sleep(len(tokens) * stub.token_delay)
+                        final["response"] = "".join(tokens)
+                        final["total_duration"] = int((time.perf_counter() - started) * 1e9)
+                        self._send_json(final)
+                        return
+
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    for index, token in enumerate(tokens):
+                        if index == stall_after:
+                            stub.stopped.wait()
+                            return
+                        if stub.token_delay:
+                            time.sleep(stub.token_delay)
+                        self._write_chunk({"model": final["model"], "response": token, "done": False})
+                    final["response"] = ""
+                    final["total_duration"] = int((time.perf_counter() - started) * 1e9)
+                    self._write_chunk(final)
+                    self.wfile.write(b"0\r\n\r\n")
+                    self.wfile.flush()
+                finally:
+                    if stub.slots:
+                        stub.slots.release()
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ollama-compatible stand-in server")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    parser.add_argument("--parallel", type=int, default=None)
+    args = parser.parse_args()
+
+    stub = OllamaStub(port=args.port, latency=args.latency, token_delay=args.token_delay, parallel=args.parallel)
+    print(f"Ollama stub listening on {stub.url}")
+    stub.server.serve_forever()
@@ -0,0 +1,153 @@
+from typing import Dict, List, Optional, Tuple
+import csv
+import os
+import numpy as np
+from calorie_engine import CalorieEngine, HEALTH_OVERWEIGHT, health_flags
+from llm_validation import normalize_breed
+
+# Breed metadata: typical adult weight, size class, brachycephalic skull,
+# breed group and known dietary sensitivities. The facts derived from it go
+# in the prompt, so the model doesn't have to infer breed traits itself.
+BREEDS_CSV: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "breeds.csv")
+
+SIZE_CLASSES: Tuple[str, ...] = ("toy", "small", "medium", "large", "giant")
+BREED_GROUPS: Tuple[str, ...] = (
+    "toy", "terrier", "hound", "sporting", "working", "herding", "non-sporting", "active", "companion",
+)
+HIGH_PROTEIN_GROUPS: Tuple[str, ...] = ("sporting", "working", "herding", "active")
+
+# Sensitivity -> feeding note; a breed's sensitivities are stored as a bit
+# mask over this order
+SENSITIVITY_NOTES: Dict[str, str] = {
+    "obesity": "Prone to weight gain: weigh portions and keep treats within the treat limit",
+    "bloat": "Bloat risk: split food into at least two meals and avoid vigorous exercise an hour around meals",
+    "joints": "Prone to joint problems: keep the pet lean, omega-3 rich fish supports the joints",
+    "pancreatitis": "Prone to pancreatitis: keep fat moderate and avoid fatty scraps",
+    "skin": "Prone to skin allergies: keep ingredients few and consistent, omega-3 supports the coat",
+    "urinary": "Prone to urinary stones: moisture-rich food and plenty of fresh water",
+    "urate": "Forms urate stones: low-purine proteins like eggs and dairy, no organ meats",
+    "copper": "Copper storage disease: avoid copper-rich foods like liver and shellfish",
+    "heart": "Heart disease risk: keep sodium low, taurine-rich proteins like meat and fish",
+    "kidney": "Kidney disease risk: moisture-rich food, moderate high-quality protein, limited phosphorus",
+    "dental": "Dental disease is common: include crunchy foods, dental chews count towards the treats",
+    "diabetes": "Diabetes risk: no sugary foods, favor fiber and complex carbohydrates",
+    "stomach": "Sensitive stomach: easily digestible proteins, introduce new foods slowly",
+    "hypoglycemia": "Low blood sugar risk: small meals spread over the day, no long gaps between meals",
+}
+_SENSITIVITY_BITS: Dict[str, int] = {name: 1 << bit for bit, name in enumerate(SENSITIVITY_NOTES)}
+
+# Size class of a pet without breed data, by weight in kg
+_DOG_SIZE_LIMITS: Tuple[float, ...] = (5.0, 10.0, 25.0, 45.0)
+_CAT_SIZE_LIMITS: Tuple[float, ...] = (3.5, 6.5)
+_CAT_SIZES: Tuple[str, ...] = ("small", "medium", "large")
+
+LARGE_BREED_PUPPY_MAX_YEARS: float = 1.5
+
+
+def size_class(species: str, weight: float) -> str:
+    if species == "cat":
+        return _CAT_SIZES[int(np.searchsorted(_CAT_SIZE_LIMITS, weight, side="right"))]
+    return SIZE_CLASSES[int(np.searchsorted(_DOG_SIZE_LIMITS, weight, side="right"))]
+
+
+class BreedTable:
+    """Breed metadata loaded once into column arrays, one row per breed"""
+
+    def __init__(self, path: str = BREEDS_CSV):
+        with open(path, newline="", encoding="utf-8") as file:
+            rows: List[Dict[str, str]] = list(csv.DictReader(file))
+
+        self.names: List[str] = [row["breed"] for row in rows]
+        self._rows: Dict[Tuple[str, str], int] = {
+            (row["species"], normalize_breed(row["breed"])): index for index, row in enumerate(rows)
+        }
+        self.size: np.ndarray = np.array([SIZE_CLASSES.index(row["size"]) for row in rows], dtype=np.int8)
+        self.min_kg: np.ndarray = np.array([float(row["min_kg"]) for row in rows], dtype=np.float32)
+        self.max_kg: np.ndarray = np.array([float(row["max_kg"]) for row in rows], dtype=np.float32)
+        self.brachycephalic: np.ndarray = np.array([row["brachycephalic"] == "1" for row in rows], dtype=bool)
+        self.group: np.ndarray = np.array([BREED_GROUPS.index(row["group"]) for row in rows], dtype=np.int8)
+        self.sensitivities: np.ndarray = np.array([
+            sum(_SENSITIVITY_BITS[name] for name in row["sensitivities"].split(";") if name) for row in rows
+        ], dtype=np.uint32)
+        for array in (self.size, self.min_kg, self.max_kg, self.brachycephalic, self.group, self.sensitivities):
+            array.setflags(write=False)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def row(self, species: str, breed: str) -> Optional[int]:
+        return self._rows.get((str(species).strip().lower(), normalize_breed(breed)))
+
+    def profile(self, pet_data: Dict, calorie_engine: CalorieEngine) -> Dict:
+        """Breed facts for a validated pet, with the calorie band for the
+        breed's typical weight and the feeding notes that follow from them"""
+        species: str = str(pet_data["species"]).strip().lower()
+        weight: float = float(pet_data["weight"])
+        age: float = float(pet_data["age"])
+        row: Optional[int] = self.row(species, pet_data["breed"])
+
+        notes: List[str] = []
+        profile: Dict = {
+            "breed": pet_data["breed"],
+            "sizeClass": size_class(species, weight),
+            "weightRangeKg": None,
+            "weightStatus": None,
+            "calorieBand": None,
+            "brachycephalic": False,
+            "group": None,
+            "sensitivities": [],
+            "notes": notes,
+        }
+        if row is not None:
+            low, high = float(self.min_kg[row]), float(self.max_kg[row])
+            mask: int = int(self.sensitivities[row])
+            profile.update({
+                "sizeClass": SIZE_CLASSES[self.size[row]],
+                "weightRangeKg": [low, high],
+                "weightStatus": "below" if weight < low else "above" if weight > high else "within",
+                # Daily calories this pet would need at the ends of the
+                # breed's typical weight range
+                "calorieBand": [
+                    calorie_engine.calculate({**pet_data, "weight": low})["dailyCalories"],
+                    calorie_engine.calculate({**pet_data, "weight": high})["dailyCalories"],
+                ],
+                "brachycephalic": bool(self.brachycephalic[row]),
+                "group": BREED_GROUPS[self.group[row]],
+                "sensitivities": [name for name, bit in _SENSITIVITY_BITS.items() if mask & bit],
+            })
+
+        size: str = profile["sizeClass"]
+        if size in ("toy", "small") and species == "dog":
+            notes.append("Small breed: three to four smaller meals a day, small bite-sized pieces")
+        if size in ("large", "giant") and species == "dog":
+            if age < LARGE_BREED_PUPPY_MAX_YEARS:
+                notes.append("Large breed puppy: controlled calories and calcium for steady growth")
+            if "bloat" not in profile["sensitivities"]:
+                notes.append("Large breed: at least two meals a day, no vigorous exercise right after eating")
+        if profile["brachycephalic"]:
+            notes.append("Brachycephalic: easy-to-pick-up food pieces in a shallow bowl, slow feeding")
+        if profile["group"] in HIGH_PROTEIN_GROUPS:
+            notes.append(f"{profile['group'].capitalize()} breed: higher protein requirements, most on active days")
+        if profile["weightStatus"] == "above" and not health_flags(pet_data.get("health_concerns")) & HEALTH_OVERWEIGHT:
+            notes.append("Weight is above the breed's typical range: check body condition before adding calories")
+        notes.extend(SENSITIVITY_NOTES[name] for name in profile["sensitivities"])
+        return profile
+
+
+def format_breed_profile(profile: Dict) -> str:
+    lines: List[str] = [f"- Size: {profile['sizeClass']}"]
+    if profile["weightRangeKg"] is not None:
+        low, high = profile["weightRangeKg"]
+        lines[0] += f" ({low:g}-{high:g} kg typical adult weight, this pet is {profile['weightStatus']} that range)"
+        band_low, band_high = profile["calorieBand"]
+        band: str = f"{band_low}" if band_low == band_high else f"{band_low}-{band_high}"
+        lines.append(f"- Calorie band at the breed's typical weight: {band} kcal/day")
+        lines.append(f"- Group: {profile['group']}")
+    else:
+        lines.append("- No breed data, sized by weight")
+    lines.extend(f"- {note}" for note in profile["notes"])
+    return "\n".join(lines)
+
+
+# Loaded once at import and shared by every request
+BREED_TABLE: BreedTable = BreedTable()
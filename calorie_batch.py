@@ -0,0 +1,131 @@
+from typing import Dict, Optional, Sequence, Union
+import numpy as np
+from calorie_engine import (
+    ACTIVITY_MULTIPLIERS,
+    ADULT_AGE_YEARS,
+    CAT_BAND_KG,
+    CAT_BASE_CALORIES,
+    HEALTH_OVERWEIGHT,
+    HEALTH_PREGNANT,
+    HEALTH_UNDERWEIGHT,
+    JUVENILE_MULTIPLIER,
+    KCAL_PER_CAN,
+    KCAL_PER_CUP,
+    LARGE_DOG_BASE_CALORIES,
+    LARGE_DOG_MIN_KG,
+    MEDIUM_DOG_BASE_CALORIES,
+    OVERWEIGHT_MULTIPLIER,
+    PREGNANT_MULTIPLIER,
+    SENIOR_AGE_YEARS,
+    SENIOR_MULTIPLIER,
+    SMALL_DOG_BASE_CALORIES,
+    SMALL_DOG_MAX_KG,
+    TREAT_SHARE,
+    UNDERWEIGHT_MULTIPLIER,
+    YOUNG_AGE_YEARS,
+    YOUNG_MULTIPLIER,
+    health_flags,
+)
+
+# Columnar version of CalorieEngine for fleet-wide recalculation. Species and
+# activity levels can be passed as strings or as the integer codes below.
+SPECIES_DOG: int = 0
+SPECIES_CAT: int = 1
+SPECIES_CODES: Dict[str, int] = {"dog": SPECIES_DOG, "cat": SPECIES_CAT}
+
+ACTIVITY_LOW: int = 0
+ACTIVITY_MEDIUM: int = 1
+ACTIVITY_HIGH: int = 2
+ACTIVITY_CODES: Dict[str, int] = {"low": ACTIVITY_LOW, "medium": ACTIVITY_MEDIUM, "high": ACTIVITY_HIGH}
+
+_ACTIVITY_MULTIPLIERS: np.ndarray = np.array(
+    [ACTIVITY_MULTIPLIERS["low"], ACTIVITY_MULTIPLIERS["medium"], ACTIVITY_MULTIPLIERS["high"]]
+)
+_SENIOR_AGE_YEARS: np.ndarray = np.array([SENIOR_AGE_YEARS["dog"], SENIOR_AGE_YEARS["cat"]])
+
+ArrayLike = Union[np.ndarray, Sequence]
+
+
+def _encode(values: ArrayLike, codes: Dict[str, int], default: Optional[int], name: str) -> np.ndarray:
+    array: np.ndarray = np.asarray(values)
+    if array.dtype.kind in "iu":
+        # Checked before the cast, a negative code would index from the end
+        # of the lookup tables and a large one wrap around in int8
+        if array.size and (array.min() < 0 or array.max() > max(codes.values())):
+            raise ValueError(f"Unknown {name} code, expected 0 to {max(codes.values())}")
+        return array.astype(np.int8, copy=False)
+
+    # Only the distinct labels go through Python, rows are mapped by index
+    labels, inverse = np.unique(array, return_inverse=True)
+    label_codes = []
+    for label in labels:
+        code: Optional[int] = codes.get(str(label).strip().lower(), default)
+        if code is None:
+            raise ValueError(f"Unknown {name} '{label}'")
+        label_codes.append(code)
+    return np.asarray(label_codes, dtype=np.int8)[inverse.reshape(-1)]
+
+
+def encode_species(species: ArrayLike) -> np.ndarray:
+    return _encode(species, SPECIES_CODES, None, "species")
+
+
+def encode_activity_levels(activity_levels: ArrayLike) -> np.ndarray:
+    # Unknown activity levels are treated as Medium, like CalorieEngine
+    return _encode(activity_levels, ACTIVITY_CODES, ACTIVITY_MEDIUM, "activity level")
+
+
+def encode_health_concerns(health_concerns: ArrayLike) -> np.ndarray:
+    labels, inverse = np.unique(np.asarray(health_concerns, dtype=str), return_inverse=True)
+    return np.asarray([health_flags(str(label)) for label in labels], dtype=np.int8)[inverse.reshape(-1)]
+
+
+def calculate_calories_batch(species: ArrayLike, weight: ArrayLike, age: ArrayLike,
+                             activity_level: ArrayLike, health: Optional[ArrayLike] = None) -> Dict[str, np.ndarray]:
+    # health holds HEALTH_* bit flags per pet (see encode_health_concerns)
+    species_codes: np.ndarray = encode_species(species)
+    activity_codes: np.ndarray = encode_activity_levels(activity_level)
+    weight = np.asarray(weight, dtype=np.float64)
+    age = np.asarray(age, dtype=np.float64)
+    flags: np.ndarray = np.zeros(len(weight), dtype=np.int8) if health is None else np.asarray(health, dtype=np.int8)
+
+    if np.any(weight <= 0):
+        raise ValueError("Weight must be greater than 0")
+
+    cat_low, cat_high = CAT_BAND_KG
+    cat_base: np.ndarray = np.where(
+        weight < cat_low,
+        CAT_BASE_CALORIES * weight / cat_low,
+        np.where(weight > cat_high, CAT_BASE_CALORIES * weight / cat_high, CAT_BASE_CALORIES)
+    )
+    dog_base: np.ndarray = np.where(
+        weight <= SMALL_DOG_MAX_KG,
+        SMALL_DOG_BASE_CALORIES,
+        np.where(weight < LARGE_DOG_MIN_KG, MEDIUM_DOG_BASE_CALORIES, LARGE_DOG_BASE_CALORIES)
+    )
+    calories: np.ndarray = np.where(species_codes == SPECIES_CAT, cat_base, dog_base)
+
+    calories *= _ACTIVITY_MULTIPLIERS[activity_codes]
+    calories *= np.where(
+        age < YOUNG_AGE_YEARS,
+        YOUNG_MULTIPLIER,
+        np.where(
+            age < ADULT_AGE_YEARS,
+            JUVENILE_MULTIPLIER,
+            np.where(age >= _SENIOR_AGE_YEARS[species_codes], SENIOR_MULTIPLIER, 1.0)
+        )
+    )
+    calories *= (
+        np.where(flags & HEALTH_OVERWEIGHT, OVERWEIGHT_MULTIPLIER, 1.0)
+        * np.where(flags & HEALTH_UNDERWEIGHT, UNDERWEIGHT_MULTIPLIER, 1.0)
+        * np.where(flags & HEALTH_PREGNANT, PREGNANT_MULTIPLIER, 1.0)
+    )
+
+    daily_calories: np.ndarray = np.rint(calories)
+    return {
+        "dailyCalories": daily_calories.astype(np.int32),
+        # Same rounding as calorie_engine.portion
+        "dryFoodCups": np.rint(daily_calories * 100 / KCAL_PER_CUP) / 100,
+        "wetFoodCans": np.rint(daily_calories * 100 / KCAL_PER_CAN) / 100,
+        "treatCaloriesMax": np.rint(daily_calories * TREAT_SHARE).astype(np.int32),
+    }
@@ -0,0 +1,145 @@
+from typing import Dict, Optional
+import re
+
+# Feeding rules from the nutrition guidelines. Base calories are the middle
+# of the Medium activity range of each species/size band; the Low/High
+# activity multipliers then land inside the Low/High ranges of the table.
+CAT_BASE_CALORIES: float = 275.0            # 3-6 kg, scaled linearly outside the band
+CAT_BAND_KG = (3.0, 6.0)
+SMALL_DOG_MAX_KG: float = 10.0
+LARGE_DOG_MIN_KG: float = 25.0
+SMALL_DOG_BASE_CALORIES: float = 500.0      # 1-10 kg
+MEDIUM_DOG_BASE_CALORIES: float = 1100.0    # 10-25 kg
+LARGE_DOG_BASE_CALORIES: float = 2000.0     # 25 kg+
+
+ACTIVITY_MULTIPLIERS: Dict[str, float] = {
+    "low": 0.8,
+    "medium": 1.0,
+    "high": 1.2,
+}
+
+YOUNG_AGE_YEARS: float = 0.5                # younger than this: x2.0
+ADULT_AGE_YEARS: float = 1.0                # younger than this: x1.5
+YOUNG_MULTIPLIER: float = 2.0
+JUVENILE_MULTIPLIER: float = 1.5
+SENIOR_AGE_YEARS: Dict[str, float] = {"dog": 7.0, "cat": 10.0}
+SENIOR_MULTIPLIER: float = 0.8
+
+OVERWEIGHT_MULTIPLIER: float = 0.8
+UNDERWEIGHT_MULTIPLIER: float = 1.2
+PREGNANT_MULTIPLIER: float = 1.5
+
+KCAL_PER_CUP: float = 400.0
+KCAL_PER_CAN: float = 250.0
+TREAT_SHARE: float = 0.1
+
+# Bit flags for health concerns that change the calorie target
+HEALTH_OVERWEIGHT: int = 1
+HEALTH_UNDERWEIGHT: int = 2
+HEALTH_PREGNANT: int = 4
+
+_OVERWEIGHT = re.compile(r"overweight|obes")
+_UNDERWEIGHT = re.compile(r"underweight")
+_PREGNANT = re.compile(r"pregnan|nursing|lactat")
+_KCAL = re.compile(r"\d+(?:[.,]\d+)?")
+
+
+def health_flags(health_concerns: Optional[str]) -> int:
+    concerns: str = (health_concerns or "").lower()
+    flags: int = 0
+    if _OVERWEIGHT.search(concerns):
+        flags |= HEALTH_OVERWEIGHT
+    if _UNDERWEIGHT.search(concerns):
+        flags |= HEALTH_UNDERWEIGHT
+    if _PREGNANT.search(concerns):
+        flags |= HEALTH_PREGNANT
+    return flags
+
+
+def life_stage(species: str, age: float) -> str:
+    # The age bands of CalorieEngine.age_multiplier
+    if age < YOUNG_AGE_YEARS:
+        return "young"
+    if age < ADULT_AGE_YEARS:
+        return "juvenile"
+    if age >= SENIOR_AGE_YEARS[species]:
+        return "senior"
+    return "adult"
+
+
+def portion(daily_calories: int, kcal_per_unit: float) -> float:
+    # Rounded to hundredths on the exact quotient, daily_calories * 100 is an
+    # integer; round(x / k, 2) rounds the binary approximation of x / k
+    # instead, which numpy doesn't reproduce for halves like 0.715
+    return round(daily_calories * 100 / kcal_per_unit) / 100
+
+
+def parse_kcal(caloric_intake: Optional[str]) -> Optional[int]:
+    # "1,100 kcal" / "1100 kcal/day" -> 1100
+    if not isinstance(caloric_intake, str):
+        return None
+    match = _KCAL.search(caloric_intake.replace(",", ""))
+    return round(float(match.group())) if match else None
+
+
+class CalorieEngine:
+    def base_calories(self, species: str, weight: float) -> float:
+        if species == "cat":
+            low, high = CAT_BAND_KG
+            if weight < low:
+                return CAT_BASE_CALORIES * weight / low
+            if weight > high:
+                return CAT_BASE_CALORIES * weight / high
+            return CAT_BASE_CALORIES
+        if species == "dog":
+            if weight <= SMALL_DOG_MAX_KG:
+                return SMALL_DOG_BASE_CALORIES
+            if weight < LARGE_DOG_MIN_KG:
+                return MEDIUM_DOG_BASE_CALORIES
+            return LARGE_DOG_BASE_CALORIES
+        raise ValueError(f"No calorie guidelines for species '{species}'")
+
+    def age_multiplier(self, species: str, age: float) -> float:
+        if age < YOUNG_AGE_YEARS:
+            return YOUNG_MULTIPLIER
+        if age < ADULT_AGE_YEARS:
+            return JUVENILE_MULTIPLIER
+        if age >= SENIOR_AGE_YEARS[species]:
+            return SENIOR_MULTIPLIER
+        return 1.0
+
+    def health_multiplier(self, health_concerns: str) -> float:
+        flags: int = health_flags(health_concerns)
+        multiplier: float = 1.0
+        if flags & HEALTH_OVERWEIGHT:
+            multiplier *= OVERWEIGHT_MULTIPLIER
+        if flags & HEALTH_UNDERWEIGHT:
+            multiplier *= UNDERWEIGHT_MULTIPLIER
+        if flags & HEALTH_PREGNANT:
+            multiplier *= PREGNANT_MULTIPLIER
+        return multiplier
+
+    def calculate(self, pet_data: Dict) -> Dict:
+        species: str = str(pet_data["species"]).strip().lower()
+        weight: float = float(pet_data["weight"])
+        age: float = float(pet_data["age"])
+        if weight <= 0:
+            raise ValueError("Weight must be greater than 0")
+
+        # Unknown activity levels are treated as Medium
+        activity: float = ACTIVITY_MULTIPLIERS.get(str(pet_data.get("activity_level", "")).strip().lower(), 1.0)
+
+        daily_calories: int = round(
+            self.base_calories(species, weight)
+            * activity
+            * self.age_multiplier(species, age)
+            * self.health_multiplier(str(pet_data.get("health_concerns", "")))
+        )
+
+        return {
+            "dailyCalories": daily_calories,
+            "caloricIntake": f"{daily_calories} kcal",
+            "dryFoodCups": portion(daily_calories, KCAL_PER_CUP),
+            "wetFoodCans": portion(daily_calories, KCAL_PER_CAN),
+            "treatCaloriesMax": round(daily_calories * TREAT_SHARE),
+        }
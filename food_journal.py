@@ -0,0 +1,227 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from llm_budget import estimate_tokens
+
+# Journal quantities are normalized to cups (dry food and anything measured
+# by volume), cans (wet food) or grams (anything weighed). Other units, like
+# pieces, are kept as they are.
+UNIT_CONVERSIONS: Dict[str, Tuple[str, float]] = {
+    "cup": ("cups", 1.0),
+    "cups": ("cups", 1.0),
+    "c": ("cups", 1.0),
+    "tbsp": ("cups", 1 / 16),
+    "tablespoon": ("cups", 1 / 16),
+    "tablespoons": ("cups", 1 / 16),
+    "tsp": ("cups", 1 / 48),
+    "teaspoon": ("cups", 1 / 48),
+    "teaspoons": ("cups", 1 / 48),
+    "ml": ("cups", 1 / 236.588),
+    "l": ("cups", 1000 / 236.588),
+    "can": ("cans", 1.0),
+    "cans": ("cans", 1.0),
+    "tin": ("cans", 1.0),
+    "tins": ("cans", 1.0),
+    "g": ("grams", 1.0),
+    "gr": ("grams", 1.0),
+    "gram": ("grams", 1.0),
+    "grams": ("grams", 1.0),
+    "kg": ("grams", 1000.0),
+    "oz": ("grams", 28.3495),
+    "ounce": ("grams", 28.3495),
+    "ounces": ("grams", 28.3495),
+    "lb": ("grams", 453.592),
+    "lbs": ("grams", 453.592),
+    "pound": ("grams", 453.592),
+    "pounds": ("grams", 453.592),
+}
+
+# Entries closer together than this belong to the same meal
+MEAL_GAP_MINUTES: float = 30.0
+# Gaps longer than a day are days without journal entries, not meal spacing
+MAX_MEAL_GAP_MINUTES: float = 24 * 60.0
+FEEDING_TIMES_SHOWN: int = 4
+
+
+def normalize_quantity(quantity, unit) -> Optional[Tuple[str, float]]:
+    try:
+        amount: float = float(quantity)
+    except (TypeError, ValueError):
+        return None
+    key: str = str(unit or "").strip().lower().rstrip(".")
+    if key in UNIT_CONVERSIONS:
+        normalized_unit, factor = UNIT_CONVERSIONS[key]
+        return normalized_unit, amount * factor
+    return key or "servings", amount
+
+
+def _factorize(values: List) -> Tuple[np.ndarray, List]:
+    # Integer code per value plus the distinct values in order of first
+    # appearance; a dict pass is much faster than np.unique on strings
+    index: Dict = {}
+    codes: List[int] = [index.setdefault(value, len(index)) for value in values]
+    return np.array(codes, dtype=np.intp), list(index)
+
+
+def _parse_minutes(values: List) -> np.ndarray:
+    # Wall-clock minutes since the epoch, NaT where the time can't be parsed.
+    # Only "YYYY-MM-DDTHH:MM" is read, so a timezone suffix doesn't shift the
+    # feeding times away from the owner's local time.
+    stamps: List[str] = [str(value)[:16] for value in values]
+    try:
+        return np.array(stamps, dtype="datetime64[m]")
+    except ValueError:
+        parsed: List = []
+        for stamp in stamps:
+            try:
+                parsed.append(np.datetime64(stamp, "m"))
+            except ValueError:
+                parsed.append(np.datetime64("NaT"))
+        return np.array(parsed, dtype="datetime64[m]")
+
+
+def _parse_quantities(values: List) -> np.ndarray:
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        parsed: List[float] = []
+        for value in values:
+            try:
+                parsed.append(float(value))
+            except (TypeError, ValueError):
+                parsed.append(np.nan)
+        return np.array(parsed, dtype=np.float64)
+
+
+def _format_amounts(amounts: Dict[str, float]) -> str:
+    rounded: List[Tuple[str, float]] = [
+        (unit, round(total, 2 if total < 1 else 1)) for unit, total in sorted(amounts.items())
+    ]
+    return ", ".join(f"{total:g} {unit}" for unit, total in rounded if total)
+
+
+def summarize_food_journal(food_journal: List[Dict]) -> Dict:
+    """Aggregates journal entries per food, per time of day and per day"""
+    raw_codes, raw_foods = _factorize([str(entry.get("description", "")) for entry in food_journal])
+    # Descriptions differing only in case or spacing are the same food
+    food_codes, food_names = _factorize([" ".join(str(food).split()).casefold() for food in raw_foods])
+    display_names: Dict[int, str] = {}
+    for raw, code in zip(raw_foods, food_codes.tolist()):
+        display_names.setdefault(code, " ".join(str(raw).split()))
+    food_codes = food_codes[raw_codes]
+
+    raw_unit_codes, raw_units = _factorize([entry.get("quantityUnit") for entry in food_journal])
+    unit_names: List[str] = []
+    unit_codes: List[int] = []
+    unit_factors: List[float] = []
+    for raw_unit in raw_units:
+        unit, factor = normalize_quantity(1.0, raw_unit)
+        if unit not in unit_names:
+            unit_names.append(unit)
+        unit_codes.append(unit_names.index(unit))
+        unit_factors.append(factor)
+    units: np.ndarray = np.array(unit_codes, dtype=np.intp)[raw_unit_codes]
+    amounts: np.ndarray = _parse_quantities([entry.get("quantity") for entry in food_journal]) \
+        * np.array(unit_factors, dtype=np.float64)[raw_unit_codes]
+    has_amount: np.ndarray = ~np.isnan(amounts)
+
+    minutes: np.ndarray = _parse_minutes([entry.get("dateTime") for entry in food_journal])
+    timed: np.ndarray = ~np.isnat(minutes)
+    timed_minutes: np.ndarray = np.sort(minutes[timed].astype(np.int64))
+
+    # Entry counts and per-unit totals for every food
+    food_count: int = len(food_names)
+    unit_count: int = len(unit_names)
+    counts: np.ndarray = np.bincount(food_codes, minlength=food_count)
+    totals: np.ndarray = np.bincount(
+        food_codes[has_amount] * unit_count + units[has_amount],
+        weights=amounts[has_amount], minlength=food_count * unit_count
+    ).reshape(food_count, unit_count)
+
+    foods: List[Dict] = []
+    for code in np.argsort(-counts, kind="stable").tolist():
+        foods.append({
+            "food": display_names[code],
+            "count": int(counts[code]),
+            "totals": {unit_names[u]: float(totals[code, u]) for u in range(unit_count) if totals[code, u]},
+        })
+
+    # Feeding times by hour of day
+    hour_counts: np.ndarray = np.bincount(timed_minutes % 1440 // 60, minlength=24)
+    feeding_hours: List[Tuple[int, int]] = [
+        (hour, int(hour_counts[hour]))
+        for hour in np.argsort(-hour_counts, kind="stable")[:FEEDING_TIMES_SHOWN].tolist() if hour_counts[hour]
+    ]
+
+    # Meal spacing: entries less than MEAL_GAP_MINUTES apart are one meal and
+    # gaps over MAX_MEAL_GAP_MINUTES are days without entries
+    gaps: np.ndarray = np.diff(timed_minutes)
+    gaps = gaps[(gaps >= MEAL_GAP_MINUTES) & (gaps <= MAX_MEAL_GAP_MINUTES)]
+
+    # Daily totals: amounts of the entries with a known day, averaged over
+    # the days that have any entry
+    days: np.ndarray = np.unique(timed_minutes // 1440)
+    dated: np.ndarray = has_amount & timed
+    daily_totals: np.ndarray = np.bincount(units[dated], weights=amounts[dated], minlength=unit_count)
+
+    first_day: Optional[str] = str(np.datetime64(int(days[0]), "D")) if len(days) else None
+    last_day: Optional[str] = str(np.datetime64(int(days[-1]), "D")) if len(days) else None
+    return {
+        "entries": len(food_journal),
+        "firstDay": first_day,
+        "lastDay": last_day,
+        "days": len(days),
+        "foods": foods,
+        "feedingHours": feeding_hours,
+        "timedEntries": len(timed_minutes),
+        "averageMealSpacingHours": float(gaps.mean()) / 60 if len(gaps) else None,
+        "averageDailyTotals": {
+            unit_names[u]: float(daily_totals[u]) / len(days) for u in range(unit_count) if daily_totals[u]
+        } if len(days) else {},
+    }
+
+
+def format_journal_summary(summary: Dict, max_tokens: int) -> Tuple[str, int]:
+    """Renders the summary for the prompt, dropping the least frequent foods
+    until it fits in max_tokens; returns the text and the number of foods left out"""
+    header: List[str] = []
+    if summary["firstDay"]:
+        header.append(f"- {summary['entries']} entries over {summary['days']} days "
+                      f"({summary['firstDay']} to {summary['lastDay']})")
+    else:
+        header.append(f"- {summary['entries']} entries")
+
+    footer: List[str] = []
+    if summary["feedingHours"]:
+        timed: int = summary["timedEntries"]
+        footer.append("- Typical feeding times: " + ", ".join(
+            f"{hour:02d}:00 ({count * 100 // timed}% of entries)" for hour, count in summary["feedingHours"]
+        ))
+    if summary["averageMealSpacingHours"] is not None:
+        footer.append(f"- Average time between meals: {summary['averageMealSpacingHours']:.1f} hours")
+    if summary["averageDailyTotals"]:
+        footer.append(f"- Average per day: {_format_amounts(summary['averageDailyTotals'])}")
+
+    food_lines: List[str] = []
+    for food in summary["foods"]:
+        line: str = f"  - {food['food']}: {food['count']} times"
+        if food["totals"]:
+            line += f", {_format_amounts(food['totals'])} in total"
+        food_lines.append(line)
+
+    used: int = estimate_tokens("\n".join(header + footer)) + estimate_tokens("- Foods by frequency:") + 1
+    omitted_note: str = "  - ({omitted} less frequent foods omitted)"
+    kept: int = 0
+    for line in food_lines:
+        cost: int = estimate_tokens(line) + 1
+        # Keep room for the omission note unless this is the last food
+        reserve: int = 0 if kept == len(food_lines) - 1 else estimate_tokens(omitted_note) + 1
+        if used + cost + reserve > max_tokens:
+            break
+        used += cost
+        kept += 1
+
+    omitted: int = len(food_lines) - kept
+    body: List[str] = ["- Foods by frequency:"] + food_lines[:kept]
+    if omitted:
+        body.append(omitted_note.format(omitted=omitted))
+    return "\n".join(header + body + footer), omitted
@@ -1,87 +1,137 @@
 from fastapi import HTTPException
 from langchain_ollama import OllamaLLM
 from langchain.prompts import ChatPromptTemplate
-from typing import Dict, List, Optional, Set
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple, Union
 import requests.exceptions
+import asyncio
+import httpx
+import hashlib
 import json
+import time
+from llm_cache import UNKEYED_FIELDS, MealPlanCache, SingleFlight, meal_plan_cache_key
 from llm_validation import PetDataValidator, PetValidationError
+from llm_stream import JSONSectionStream
+from llm_schema import (
+    MEAL_PLAN_SCHEMA, RECIPE_ADAPTER, RECIPE_SCHEMA, RECIPES_PER_PLAN, SECTION_ADAPTERS, SECTION_GROUPS,
+    MealPlanResponse, section_schema, validate_sections
+)
+from llm_repair import repair_json
+from pydantic import ValidationError
+from calorie_engine import CalorieEngine, parse_kcal
+from llm_pool import CONNECTION_ERRORS, OllamaBackend, OllamaBackendPool
+from llm_admission import AdmissionController, AdmissionRejected
+from llm_budget import estimate_tokens
+from food_journal import format_journal_summary, summarize_food_journal
+from breed_profiles import BREED_TABLE, format_breed_profile
+from recipe_library import RecipeLibrary, profile_tags
+from recipe_titles import RecipeTitleIndex
+from sqlalchemy.exc import SQLAlchemyError
+from llm_metrics import (
+    CACHE_HITS, CACHE_MISSES, JSON_DECODE_FAILURES, PARSING_SECONDS, PROMPT_SECONDS, VALIDATION_FAILURES,
+    VALIDATION_SECONDS, record_ollama_stats
+)
+
+# Times a recipe whose title duplicates a saved one is generated again
+# before it is kept as it is
+RECIPE_REGENERATION_ATTEMPTS: int = 2
+
+
+class OllamaStatsHandler(BaseCallbackHandler):
+    """Records the token counts and timings Ollama reports with every answer"""
+
+    # Called directly instead of through an executor, it only updates counters
+    run_inline: bool = True
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                if generation.generation_info:
+                    record_ollama_stats(generation.generation_info)
 
 
 class PetNutritionLLM:
-    def __init__(self, model_name: str = "mistral:7b"):
+    def __init__(self, model_name: str = "mistral:7b", base_url: Union[str, List[str]] = "http://localhost:11434",
+                 cache: Optional[MealPlanCache] = None, keep_alive: Union[int, str] = "30m",
+                 max_backend_failures: int = 3, backend_ejection_seconds: float = 30.0,
+                 admission: Optional[AdmissionController] = None, num_ctx: int = 4096,
+                 max_output_tokens: int = 1024, parallel_sections: bool = False,
+                 recipe_library: Optional[RecipeLibrary] = None, new_recipe_interval: int = 0,
+                 request_timeout: float = 30.0):
+        self.model_name: str = model_name
+        self.keep_alive: Union[int, str] = keep_alive
+        # Generated recipes are stored here, and served instead of generating
+        # new ones when it has enough the user hasn't seen
+        self.recipe_library: Optional[RecipeLibrary] = recipe_library
+        # Every n-th plan the library could serve gets new recipes instead, so
+        # the library keeps growing; 0 serves all of them from the library
+        self.new_recipe_interval: int = new_recipe_interval
+        self.library_plans: int = 0
+        # Generate the parts of the plan in SECTION_GROUPS as concurrent
+        # requests instead of one long answer
+        self.parallel_sections: bool = parallel_sections
+        # The prompt has to leave max_output_tokens of the context window free
+        # for the answer, the food journal is trimmed to make it fit
+        self.num_ctx: int = num_ctx
+        self.max_output_tokens: int = max_output_tokens
+        self.cache: MealPlanCache = cache if cache is not None else MealPlanCache()
+        self.single_flight: SingleFlight = SingleFlight()
+        # Bounds how many generations run and wait at once, cache hits and
+        # coalesced requests never take a slot
+        self.admission: AdmissionController = admission if admission is not None else AdmissionController()
+        self.calorie_engine: CalorieEngine = CalorieEngine()
+        # Stateless, the breed index it uses is built once at import
+        self.validator: PetDataValidator = PetDataValidator()
+
+        # One model client per Ollama-compatible endpoint
+        base_urls: List[str] = [base_url] if isinstance(base_url, str) else list(base_url)
+        backends: List[OllamaBackend] = []
+        stats_handler: OllamaStatsHandler = OllamaStatsHandler()
         try:
-            self.model: OllamaLLM = OllamaLLM(
-                model=model_name,
-                base_url="http://localhost:11434",
-                timeout=30,
-                format="json",
-                stop=[
-                    "[INST]",
-                    "[/INST]"
-                ]
+            for url in base_urls:
+                backends.append(OllamaBackend(url, OllamaLLM(
+                    model=model_name,
+                    base_url=url,
+                    # Seconds without data from Ollama before a request gives up
+                    # (httpx timeout); the text generated until then is kept and
+                    # the missing sections are requested again
+                    client_kwargs={"timeout": request_timeout},
+                    # Keeps the model, and with it the evaluated prompt prefix, loaded between requests
+                    keep_alive=keep_alive,
+                    num_ctx=num_ctx,
+                    # Ollama stops the answer at the tokens the prompt budget leaves free for it
+                    num_predict=max_output_tokens,
+                    format="json",
+                    callbacks=[stats_handler],
+                    stop=[
+                        "[INST]",
+                        "[/INST]"
+                    ]
 
-            )
+                )))
         except requests.exceptions.ConnectionError:
             raise ConnectionError(
                 "Could not connect to Ollama service. Please ensure Ollama is running"
             )
+        self.pool: OllamaBackendPool = OllamaBackendPool(
+            backends, max_failures=max_backend_failures, ejection_seconds=backend_ejection_seconds
+        )
+        self.model: OllamaLLM = backends[0].model
         
         self.template: str = (
             "[INST] You are a pet nutritionist with expertise in creating personalized meal plans for pets. "
-            "Based on the following pet details, generate a comprehensive and balanced meal plan:\n\n"
-            "- **Name:** {name} \n"
-            "- **Breed:** {breed} \n"
-            "- **Age:** {age} years \n"
-            "- **Gender:** {gender} \n"
-            "- **Species:** {species} \n"
-            "- **Weight:** {weight} kg \n"
-            "- **Activity Level:** {activity_level} (Low, Medium, High) \n"
-            "- **Health Concerns:** {health_concerns} \n\n"
+            "Based on the pet details given at the end of this prompt, generate a comprehensive and balanced meal plan.\n\n"
             "IMPORTANT CONSIDERATIONS:\n"
-            "1. Calculate calories based on species, weight, and activity level.\n"
-            "   ONLY USE THE GUIDELINES FOR THE SPECIFIC SPECIES ({species}) OF THIS PET:\n\n"
-            "   CATS (ONLY USE IF PET IS A CAT):\n"
-            "   - Indoor/Low Activity (3-6kg): 200-250 calories/day\n"
-            "   - Outdoor/Medium Activity (3-6kg): 250-300 calories/day\n"
-            "   - High Activity (3-6kg): 300-400 calories/day\n\n"
-            "   DOGS (ONLY USE IF PET IS A DOG):\n"
-            "   - Small Dogs (1-10kg):\n"
-            "     * Low Activity: 200-400 calories/day\n"
-            "     * Medium Activity: 400-600 calories/day\n"
-            "     * High Activity: 600-800 calories/day\n"
-            "   - Medium Dogs (10-25kg):\n"
-            "     * Low Activity: 800-1000 calories/day\n"
-            "     * Medium Activity: 1000-1200 calories/day\n"
-            "     * High Activity: 1200-1500 calories/day\n"
-            "   - Large Dogs (25kg+):\n"
-            "     * Low Activity: 1500-1800 calories/day\n"
-            "     * Medium Activity: 1800-2200 calories/day\n"
-            "     * High Activity: 2200-2500 calories/day\n\n"
-            "2. Portion Size Calculations:\n"
-            "   - Calculate dry food portions: Daily calories ÷ calories per cup (approximately 400 kcal/cup)\n"
-            "   - Calculate wet food portions: Daily calories ÷ calories per can (approximately 250 kcal/can)\n"
+            "1. Calories and portions are already calculated for this pet and listed under\n"
+            "   FEEDING TARGETS in the pet details. Use those exact numbers, do not recalculate them:\n"
+            "   - Split the daily calories across the meals of the meal plan\n"
             "   - Fresh food portions should be weighed in grams\n"
-            "   - Treats should not exceed 10% of daily caloric intake\n\n"
-            "3. Activity Level Adjustments:\n"
-            "   - Low Activity: Multiply base calories by 0.8\n"
-            "   - Medium Activity: Use base calories\n"
-            "   - High Activity: Multiply base calories by 1.2\n\n"
-            "4. Age Adjustments:\n"
-            "   - Puppies/Kittens: Multiply adult calories by 1.5-2\n"
-            "   - Senior Pets: Reduce adult calories by 20%\n\n"
-            "5. Health Considerations:\n"
-            "   - Overweight: Reduce calories by 20%\n"
-            "   - Underweight: Increase calories by 20%\n"
-            "   - Pregnant/Nursing: Increase calories by 50%\n\n"
-            "6. Breed-Specific Needs:\n"
-            "   - Small breeds: More frequent, smaller meals\n"
-            "   - Large breeds: Anti-bloat considerations\n"
-            "   - Brachycephalic breeds: Easy-to-eat food sizes\n"
-            "   - Working breeds: Higher protein requirements\n\n"
-            "7. Current weight of {weight}kg and activity level of {activity_level} must be used\n"
-            "   to calculate final portions using these guidelines.\n\n"
+            "   - Treats must stay within the listed treat calories\n\n"
+            "2. Breed-specific needs are listed under BREED PROFILE in the pet details. They are\n"
+            "   facts about this breed, apply them and don't add breed traits of your own.\n\n"
             "REQUIRED RESPONSE ELEMENTS:\n"
-            "1. Caloric intake must be specified in calories/day\n"
+            "1. Caloric intake must be the daily calories from the feeding targets\n"
             "2. Meal plan must include specific times and portion sizes in grams\n"
             "3. Nutrition balance must include all percentages (protein, fat, carbs, fiber, moisture)\n"
             "4. Warnings must include health considerations or 'No specific warnings for this pet'\n"
@@ -91,32 +141,26 @@ class PetNutritionLLM:
             "8. Foods to avoid must list specific items or 'Standard diet is appropriate, avoid common harmful foods'\n"
             "9. Transition guidelines must explain how to implement the meal plan\n\n"
             "IMPORTANT SPECIES-SPECIFIC INSTRUCTIONS:\n"
-            "1. This pet is a {species}. ONLY provide information relevant to {species}.\n"
+            "1. ONLY provide information relevant to the species given in the pet details.\n"
             "2. Do NOT mention dietary needs or considerations for any other species.\n"
-            "3. All recommendations must be specifically tailored for a {species}.\n"
+            "3. All recommendations must be specifically tailored for that species.\n"
             "4. Never mention cats if this is a dog, and never mention dogs if this is a cat.\n\n"
             "Consider these factors for the meal plan:\n"
             "1. Age-appropriate portions and nutritional needs\n"
             "2. Activity level and energy requirements\n"
             "3. Species-specific nutritional requirements\n"
-            "4. Breed-specific dietary considerations\n\n"
+            "4. The breed profile\n\n"
             "IMPORTANT NOTES ABOUT INGREDIENTS:\n"
             "1. Only include natural, whole food ingredients (like meats, vegetables, grains)\n"
             "2. Do not include chemical compounds, preservatives, or synthetic additives\n"
             "3. Keep ingredients simple and recognizable to pet owners\n"
             "4. Example of good ingredients: chicken breast, brown rice, sweet potatoes, carrots\n"
             "5. Focus on primary ingredients that make up the bulk of the meal\n"
-            "6. Only include ingredients that are safe and healthy for the pet\n"
-            "Consider these factors for the meal plan:\n"
-            "1. Age-appropriate portions and nutritional needs\n"
-            "2. Activity level and energy requirements\n"
-            "3. Species-specific nutritional requirements\n"
-            "4. Breed-specific dietary considerations [/INST]\n"
+            "6. Only include ingredients that are safe and healthy for the pet [/INST]\n"
         )
 
         self.food_journal_template: str = (
-            "[INST] Consider this food journal when creating the meal plan:\n\n"
-            "{food_journal}\n\n"
+            "[INST] Consider the food journal summary given at the end of this prompt when creating the meal plan.\n\n"
             "REQUIRED FOOD JOURNAL ANALYSIS:\n"
             "1. Review and incorporate previously successful meals\n"
             "2. Maintain consistent feeding times from the journal\n"
@@ -135,16 +179,16 @@ class PetNutritionLLM:
         )
         
         self.existing_recipes_template: str = (
-            "[INST] The user already has the following recipe titles saved: {existing_recipes}. "
+            "The user already has recipes saved, including these titles: {existing_recipes}. "
             "Please ensure that your suggested recipes have DIFFERENT titles than these existing ones. "
-            "Create unique recipe names that do not duplicate any of the existing titles. [/INST]\n"
+            "Create unique recipe names that do not duplicate any of the existing titles.\n\n"
         )
 
         self.closing_instructions: str = (
             "[INST] Provide a complete JSON response. Every field must be filled with meaningful content. "
             "Empty or missing fields are not acceptable. Use this exact structure:\n"
             "{{\n"
-            '  "caloricIntake": "REQUIRED: daily calories with unit, e.g. 1000 kcal always number of calories first, then kcal",\n'
+            '  "caloricIntake": "REQUIRED: daily calories from the feeding targets, e.g. 1000 kcal",\n'
             '  "mealPlan": {{\n'
             '      "breakfast": "REQUIRED: food with gram portions and time",\n'
             '      "lunch": "REQUIRED: food with gram portions and time",\n'
@@ -185,62 +229,608 @@ class PetNutritionLLM:
             "}} [/INST]\n"
         )
 
-    def generate_meal_plan(self, pet_data: Dict, food_journal: Optional[List[Dict]] = None, existing_recipes: Optional[List[str]] = None) -> Dict:
+        # Everything above is identical for every request, so Ollama can reuse
+        # the evaluated prefix from its KV cache. Per-pet data only comes last.
+        self.pet_details_template: str = (
+            "[INST] PET DETAILS:\n"
+            "- **Breed:** {breed} \n"
+            "- **Age:** {age} years \n"
+            "- **Gender:** {gender} \n"
+            "- **Species:** {species} \n"
+            "- **Weight:** {weight} kg \n"
+            "- **Activity Level:** {activity_level} (Low, Medium, High) \n"
+            "- **Health Concerns:** {health_concerns} \n\n"
+            "FEEDING TARGETS:\n"
+            "- Daily calories: {daily_calories} kcal/day\n"
+            "- Dry food only: {dry_food_cups} cups/day (400 kcal/cup)\n"
+            "- Wet food only: {wet_food_cans} cans/day (250 kcal/can)\n"
+            "- Treats: at most {treat_calories} kcal/day\n\n"
+            "BREED PROFILE:\n"
+            "{breed_profile}\n\n"
+            "FOOD JOURNAL SUMMARY:\n"
+            "{food_journal}\n\n"
+            "{existing_recipes_section}"
+            "This pet is a {species}. Create the meal plan for this pet and respond only with the JSON structure described above. [/INST]\n"
+        )
+
+        # Follow-up for an answer that was cut off. It is appended to the
+        # original prompt, which Ollama still has evaluated in its KV cache.
+        self.repair_instructions: str = (
+            "[INST] Your answer was cut off. These sections of it are complete:\n"
+            "{completed_sections}\n\n"
+            "Respond with a JSON object containing only the missing sections: {missing_sections}. [/INST]\n"
+        )
+
+        # Asks for one group of sections when they are generated in parallel
+        self.section_instructions: str = (
+            "[INST] Respond with a JSON object containing only these sections of that structure: {sections}. [/INST]\n"
+        )
+
+        # Asks for one replacement recipe when a generated title duplicates a
+        # saved one or another recipe of the plan
+        self.recipe_instructions: str = (
+            "[INST] These recipe titles are already taken: {taken_titles}. "
+            "Respond with a JSON object for one new recipe, in the structure of an entry of \"ingredients\", "
+            "whose title is clearly different from all of them. [/INST]\n"
+        )
+
+        # Part of the cache key, so changing any prompt fragment invalidates
+        # previously cached plans
+        self.template_digest: str = hashlib.sha256(
+            (self.template + self.food_journal_template + self.closing_instructions
+             + self.pet_details_template + self.existing_recipes_template + self.repair_instructions
+             + self.section_instructions + self.recipe_instructions).encode()
+        ).hexdigest()
+
+        # The prompt is parsed and the chain built once; per request only the
+        # variables are bound, so braces in user input are never re-parsed
+        self.prompt: ChatPromptTemplate = ChatPromptTemplate.from_template(
+            self.template + self.food_journal_template + self.closing_instructions + self.pet_details_template
+        )
+        for backend in self.pool.backends:
+            # The response schema is sent as Ollama's structured output format
+            backend.chain = self.prompt | backend.model.bind(format=MEAL_PLAN_SCHEMA)
+        self.repair_prompt: ChatPromptTemplate = ChatPromptTemplate.from_template(
+            self.template + self.food_journal_template + self.closing_instructions + self.pet_details_template
+            + self.repair_instructions
+        )
+        self.section_prompt: ChatPromptTemplate = ChatPromptTemplate.from_template(
+            self.template + self.food_journal_template + self.closing_instructions + self.pet_details_template
+            + self.section_instructions
+        )
+        self.recipe_prompt: ChatPromptTemplate = ChatPromptTemplate.from_template(
+            self.template + self.food_journal_template + self.closing_instructions + self.pet_details_template
+            + self.recipe_instructions
+        )
+
+        self.static_prompt_tokens: int = estimate_tokens(
+            self.prompt.format_messages(**{name: "" for name in self.prompt.input_variables})[0].content
+        )
+
+    @property
+    def ready(self) -> bool:
+        # At least one backend has the model loaded
+        return any(backend.resident for backend in self.pool.backends)
+
+    async def awarm_up(self, timeout: float = 300.0) -> bool:
+        """Load the model on every backend not yet warmed up, so the first
+        request doesn't pay for it; True once one of them has it resident"""
+        pending: List[OllamaBackend] = [backend for backend in self.pool.backends if not backend.resident]
+        await asyncio.gather(
+            *(backend.awarm_up(self.model_name, self.keep_alive, timeout) for backend in pending),
+            return_exceptions=True
+        )
+        return self.ready
+
+    def _prompt_inputs(self, validated_pet_data: Dict, feeding_targets: Dict, food_journal: Optional[List[Dict]] = None, titles: Optional[RecipeTitleIndex] = None, breed_profile: Optional[Dict] = None) -> Tuple[Dict, Dict]:
+        # Returns the prompt variables and the prompt metadata reported with
+        # the meal plan
+        started: float = time.perf_counter()
+
+        # Only the saved titles closest to the foods in the journal go in the
+        # prompt, every generated title is checked against all of them after
+        existing_recipes_section: str = ""
+        if titles:
+            shown: List[str] = titles.similar(str(entry.get("description", "")) for entry in food_journal or [])
+            existing_recipes_str: str = ", ".join([f'"{title}"' for title in shown])
+            existing_recipes_section = self.existing_recipes_template.format(existing_recipes=existing_recipes_str)
+
+        if breed_profile is None:
+            breed_profile = self._breed_profile(validated_pet_data)
+        # The name is left out, plans are shared between pets of the same
+        # profile (see meal_plan_cache_key)
+        inputs: Dict = {
+            **{key: value for key, value in validated_pet_data.items() if key not in UNKEYED_FIELDS},
+            "gender": validated_pet_data.get("gender") or "Unknown",
+            "daily_calories": feeding_targets["dailyCalories"],
+            "dry_food_cups": feeding_targets["dryFoodCups"],
+            "wet_food_cans": feeding_targets["wetFoodCans"],
+            "treat_calories": feeding_targets["treatCaloriesMax"],
+            "breed_profile": format_breed_profile(breed_profile),
+            "food_journal": "",
+            "existing_recipes_section": existing_recipes_section,
+        }
+        prompt_tokens: int = self.static_prompt_tokens + estimate_tokens(
+            "".join(str(value) for value in inputs.values())
+        )
+
+        # The food journal goes in as a summary whose size depends on the
+        # number of different foods, not entries, trimmed to what is left of
+        # the context window
+        foods: int = 0
+        omitted: int = 0
+        if food_journal:
+            summary: Dict = summarize_food_journal(food_journal)
+            journal_budget: int = self.num_ctx - self.max_output_tokens - prompt_tokens
+            journal_summary, omitted = format_journal_summary(summary, journal_budget)
+            foods = len(summary["foods"])
+        else:
+            journal_summary = "No food journal provided"
+        inputs["food_journal"] = journal_summary
+        prompt_tokens += estimate_tokens(journal_summary)
+
+        PROMPT_SECONDS.observe(time.perf_counter() - started)
+        return inputs, {
+            "estimatedPromptTokens": prompt_tokens,
+            "numCtx": self.num_ctx,
+            "journalEntries": len(food_journal or []),
+            "journalFoods": foods,
+            "journalFoodsOmitted": omitted,
+            "savedRecipeTitles": len(titles or ()),
+            "breedProfile": breed_profile,
+        }
+
+    def _parse_response(self, response: str) -> Dict:
+        # Parse and validate against the same schema the output was
+        # constrained to, in one pass
+        started: float = time.perf_counter()
         try:
-            # Initialize validator and validate pet data
-            validator = PetDataValidator()
-            try:
-                validated_pet_data = validator.validate_pet_data(pet_data)
-            except PetValidationError as validation_error:
-                error_response = {
-                    "status": "error",
-                    "code": 400,
-                    "message": str(validation_error),
-                }
-                return error_response
-            
-            # Start with base prompt
-            full_prompt: str = self.template.format(**validated_pet_data)
-
-            # Append food journal if provided
-            if food_journal:
-                food_entries: str = "\n".join(
-                    [f"- {entry['dateTime']}: {entry['description']} ({entry['quantity']} {entry['quantityUnit']})" 
-                     for entry in food_journal]
-                )
-                full_prompt += self.food_journal_template.format(food_journal=food_entries)
+            # Clean the response string to ensure it's valid JSON
+            response = response.strip()
+            if response.startswith('```json'):
+                response = response[7:]
+            if response.endswith('```'):
+                response = response[:-3]
+            response = response.strip()
+
+            return MealPlanResponse.model_validate_json(response).model_dump()
+        except ValidationError as e:
+            if any(error["type"] == "json_invalid" for error in e.errors()):
+                JSON_DECODE_FAILURES.inc()
+            raise ValueError(f"Invalid JSON response from model: {response}\nError: {str(e)}")
+        finally:
+            PARSING_SECONDS.observe(time.perf_counter() - started)
+
+    def _check_feeding_targets(self, meal_plan: Dict, feeding_targets: Dict) -> Dict:
+        # The model is given the calories as a fact; a missing or different
+        # number in its answer is replaced by the computed one
+        if parse_kcal(meal_plan.get("caloricIntake")) != feeding_targets["dailyCalories"]:
+            meal_plan["caloricIntake"] = feeding_targets["caloricIntake"]
+        return meal_plan
+
+    def _repair_inputs(self, inputs: Dict, partial: Dict, missing: List[str]) -> Dict:
+        return {
+            **inputs,
+            "completed_sections": json.dumps(partial, indent=2),
+            "missing_sections": ", ".join(missing),
+        }
+
+    def _sections_chain(self, prompt: ChatPromptTemplate, sections: List[str]) -> Callable[[OllamaBackend], Any]:
+        # The answer is constrained to just these sections
+        schema: Dict = section_schema(sections)
+        return lambda backend: prompt | backend.model.bind(format=schema)
+
+    def _merge_repair(self, partial: Dict, missing: List[str], response: str) -> List[str]:
+        # Adds the sections the follow-up completed, returns those still missing
+        completed, still_missing = validate_sections(repair_json(response), missing)
+        if not completed:
+            raise ValueError(f"Incomplete JSON response from model, missing sections: {', '.join(missing)}")
+        partial.update(completed)
+        return still_missing
+
+    async def _arepair(self, inputs: Dict, partial: Dict, missing: List[str]) -> Dict:
+        # Only the sections that were cut off or invalid are asked for again.
+        # A follow-up can be cut off too, so this repeats for as long as every
+        # round completes at least one more section.
+        while missing:
+            response: str = await self._ainvoke(self._repair_inputs(inputs, partial, missing), self._sections_chain(self.repair_prompt, missing))
+            missing = self._merge_repair(partial, missing, response)
+        return {name: partial[name] for name in SECTION_ADAPTERS}
+
+    async def _acomplete_meal_plan(self, inputs: Dict, response: str) -> Tuple[Dict, List[str]]:
+        # Returns the meal plan and the sections that had to be generated again
+        try:
+            return self._parse_response(response), []
+        except ValueError:
+            partial, missing = validate_sections(repair_json(response))
+        return await self._arepair(inputs, partial, missing), missing
+
+    def _recipe_inputs(self, inputs: Dict, recipes: List[Dict], index: int, titles: RecipeTitleIndex) -> Dict:
+        # The other recipes of the plan plus the saved titles closest to the
+        # duplicate, not every saved title
+        taken: List[str] = list(dict.fromkeys(
+            [recipe["recipeName"] for recipe in recipes] + titles.similar([recipes[index]["recipeName"]])
+        ))
+        return {**inputs, "taken_titles": ", ".join(f'"{title}"' for title in taken)}
+
+    def _recipe_chain(self, backend: OllamaBackend) -> Any:
+        return self.recipe_prompt | backend.model.bind(format=RECIPE_SCHEMA)
+
+    def _parse_recipe(self, response: str) -> Optional[Dict]:
+        try:
+            return RECIPE_ADAPTER.dump_python(RECIPE_ADAPTER.validate_python(repair_json(response)))
+        except ValidationError:
+            return None
+
+    def _duplicate_recipes(self, recipes: List[Dict], titles: RecipeTitleIndex, kept: Tuple[int, ...]) -> Tuple[RecipeTitleIndex, List[int]]:
+        # Titles the plan's recipes have to differ from, and the recipes that
+        # collide; recipes in kept were already sent and are taken as they are
+        taken: RecipeTitleIndex = titles.copy()
+        for index in kept:
+            taken.add(recipes[index]["recipeName"])
+        duplicates: List[int] = []
+        for index, recipe in enumerate(recipes):
+            if index in kept:
+                continue
+            if taken.collision(recipe["recipeName"]) is not None:
+                duplicates.append(index)
             else:
-                full_prompt += self.food_journal_template.format(food_journal="No food journal provided")
-                
-            # Add existing recipes information if provided
-            if existing_recipes and len(existing_recipes) > 0:
-                existing_recipes_str: str = ", ".join([f'"{title}"' for title in existing_recipes])
-                full_prompt += self.existing_recipes_template.format(existing_recipes=existing_recipes_str)
+                taken.add(recipe["recipeName"])
+        return taken, duplicates
+
+    async def _aunique_recipes(self, inputs: Dict, recipes: List[Dict], titles: RecipeTitleIndex, kept: Tuple[int, ...] = ()) -> List[int]:
+        # Generates only the recipes whose title duplicates a saved one or an
+        # earlier recipe of the plan again, in place; returns their indices
+        taken, duplicates = self._duplicate_recipes(recipes, titles, kept)
+        for index in duplicates:
+            for _attempt in range(RECIPE_REGENERATION_ATTEMPTS):
+                response: str = await self._ainvoke(
+                    self._recipe_inputs(inputs, recipes, index, taken), self._recipe_chain
+                )
+                recipe: Optional[Dict] = self._parse_recipe(response)
+                if recipe is not None:
+                    recipes[index] = recipe
+                    if taken.collision(recipe["recipeName"]) is None:
+                        break
+            taken.add(recipes[index]["recipeName"])
+        return duplicates
 
-            # Add final instructions
-            full_prompt += self.closing_instructions
+    async def _agenerate_section_group(self, inputs: Dict, sections: List[str]) -> Tuple[List[str], str]:
+        response: str = await self._ainvoke(
+            {**inputs, "sections": ", ".join(sections)}, self._sections_chain(self.section_prompt, sections)
+        )
+        return sections, response
+
+    async def _agenerate_sections(self, inputs: Dict, groups: List[List[str]], partial: Optional[Dict] = None) -> Tuple[Dict, List[str]]:
+        # Every group is a separate request, so the groups decode at the same
+        # time on different Ollama slots or backends. Groups that come back
+        # incomplete go through the same repair as a cut-off answer.
+        tasks = [asyncio.ensure_future(self._agenerate_section_group(inputs, sections)) for sections in groups]
+        try:
+            responses: List[Tuple[List[str], str]] = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
 
-            prompt: ChatPromptTemplate = ChatPromptTemplate.from_template(full_prompt)
-            chain = prompt | self.model
-            response: str = chain.invoke(validated_pet_data)
+        partial = dict(partial or {})
+        missing: List[str] = []
+        for sections, response in responses:
+            valid, invalid = validate_sections(repair_json(response), sections)
+            partial.update(valid)
+            missing += invalid
+        return await self._arepair(inputs, partial, missing), missing
 
-            # Try to parse the response as JSON
+    def _section_groups(self, library_recipes: Optional[List[Dict]]) -> List[List[str]]:
+        # Requests to make when the plan is generated in sections: the
+        # parallel groups, or a single one for everything but the recipes
+        # when those come from the library
+        if library_recipes is None:
+            return SECTION_GROUPS
+        if self.parallel_sections:
+            return [sections for sections in SECTION_GROUPS if "ingredients" not in sections]
+        return [[name for name in SECTION_ADAPTERS if name != "ingredients"]]
+
+    async def _library_recipes(self, validated_pet_data: Dict, tags: Dict, food_journal: Optional[List[Dict]], titles: RecipeTitleIndex) -> Optional[List[Dict]]:
+        # Recipes from the library generated for the same pet profile, that
+        # share an ingredient with the foods in the journal, contain nothing
+        # named in the health concerns and don't duplicate the user's saved
+        # ones; None if there aren't enough
+        if self.recipe_library is None:
+            return None
+        foods: List[str] = list({str(entry.get("description", "")) for entry in food_journal or []})
+        if not foods:
+            return None
+        loop = asyncio.get_event_loop()
+        try:
+            # Exact title matches are excluded by the query, near duplicates
+            # below, so ask for a few spare candidates
+            candidates: List[Dict] = await loop.run_in_executor(
+                None, self.recipe_library.find, validated_pet_data["species"], foods, titles.titles, RECIPES_PER_PLAN * 3,
+                tags, [str(validated_pet_data.get("health_concerns") or "")]
+            )
+        except SQLAlchemyError:
+            # The library is an optimization, generate the recipes instead
+            return None
+        taken: RecipeTitleIndex = titles.copy()
+        recipes: List[Dict] = []
+        for recipe in candidates:
+            if len(recipes) < RECIPES_PER_PLAN and taken.collision(recipe["recipeName"]) is None:
+                taken.add(recipe["recipeName"])
+                recipes.append(recipe)
+        if len(recipes) < RECIPES_PER_PLAN:
+            return None
+        self.library_plans += 1
+        if self.new_recipe_interval > 0 and self.library_plans % self.new_recipe_interval == 0:
+            return None
+        return recipes
+
+    async def _update_library(self, species: str, tags: Dict, recipes: List[Dict], from_library: bool) -> None:
+        loop = asyncio.get_event_loop()
+        try:
+            if from_library:
+                await loop.run_in_executor(
+                    None, self.recipe_library.mark_served, species, [r["recipeName"] for r in recipes], tags
+                )
+            else:
+                await loop.run_in_executor(None, self.recipe_library.add, species, recipes, tags)
+        except SQLAlchemyError:
+            pass
+
+    async def _ainvoke(
+        self,
+        inputs: Dict,
+        chain: Optional[Callable[[OllamaBackend], Any]] = None,
+        on_chunk: Optional[Callable[[str], None]] = None
+    ) -> str:
+        # A backend that can't be reached is retried on the next one
+        tried: Set[str] = set()
+        while True:
+            chunks: List[str] = []
             try:
-                # Clean the response string to ensure it's valid JSON
-                response = response.strip()
-                if response.startswith('```json'):
-                    response = response[7:]
-                if response.endswith('```'):
-                    response = response[:-3]
-                response = response.strip()
-                
-                return json.loads(response)
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Invalid JSON response from model: {response}\nError: {str(e)}")
-            
+                with self.pool.acquire(exclude=tried) as backend:
+                    runnable = backend.chain if chain is None else chain(backend)
+                    try:
+                        async for chunk in runnable.astream(inputs):
+                            chunks.append(chunk)
+                            if on_chunk is not None:
+                                on_chunk(chunk)
+                    except httpx.TimeoutException:
+                        # Keep what was generated before the timeout, the
+                        # missing sections are requested again
+                        if not chunks:
+                            raise
+                    return "".join(chunks)
+            except CONNECTION_ERRORS:
+                tried.add(backend.base_url)
+                # Chunks already passed on can't be taken back
+                if len(tried) >= len(self.pool.backends) or (chunks and on_chunk is not None):
+                    raise
+
+    def _validate_pet_data(self, pet_data: Dict) -> Dict:
+        started: float = time.perf_counter()
+        try:
+            return self.validator.validate_pet_data(pet_data)
+        except PetValidationError:
+            VALIDATION_FAILURES.inc()
+            raise
+        finally:
+            VALIDATION_SECONDS.observe(time.perf_counter() - started)
+
+    def _cached(self, cache_key: str, use_cache: bool) -> Optional[Dict]:
+        if not use_cache:
+            return None
+        cached: Optional[Dict] = self.cache.get(cache_key)
+        (CACHE_HITS if cached is not None else CACHE_MISSES).inc()
+        return cached
+
+    def _breed_profile(self, validated_pet_data: Dict) -> Dict:
+        return BREED_TABLE.profile(validated_pet_data, self.calorie_engine)
+
+    def _cache_key(self, validated_pet_data: Dict, breed_profile: Dict, food_journal: Optional[List[Dict]], existing_recipes: Optional[List[str]]) -> str:
+        return meal_plan_cache_key(
+            validated_pet_data, breed_profile, food_journal, existing_recipes, self.template_digest, self.model_name
+        )
+
+    def is_cached(self, pet_data: Dict, food_journal: Optional[List[Dict]] = None, existing_recipes: Optional[List[str]] = None) -> bool:
+        # Whether the plan for the request would come from the cache; expects
+        # pet data already validated, e.g. by the request model
+        return self.cache.contains(
+            self._cache_key(pet_data, self._breed_profile(pet_data), food_journal, existing_recipes)
+        )
+
+    async def agenerate_meal_plan(self, pet_data: Dict, food_journal: Optional[List[Dict]] = None, existing_recipes: Optional[List[str]] = None, use_cache: bool = True) -> Dict:
+        try:
+            # Validate pet data, the breed comes back as its listed name;
+            # invalid data raises PetValidationError
+            validated_pet_data = self._validate_pet_data(pet_data)
+
+            # With use_cache=False the lookup is skipped but the fresh plan
+            # still replaces the cached one
+            breed_profile: Dict = self._breed_profile(validated_pet_data)
+            cache_key: str = self._cache_key(validated_pet_data, breed_profile, food_journal, existing_recipes)
+            cached: Optional[Dict] = self._cached(cache_key, use_cache)
+            if cached is not None:
+                return cached
+
+            # Identical requests arriving while this one is generating wait
+            # for its result instead of starting their own generation
+            return await self.single_flight.do(
+                cache_key,
+                lambda: self._agenerate(cache_key, validated_pet_data, breed_profile, food_journal, existing_recipes)
+            )
+
+        except (AdmissionRejected, PetValidationError):
+            raise
         except requests.exceptions.ConnectionError:
             raise ConnectionError(
                 "Lost connection to Ollama service. Please ensure Ollama is running and accessible."
             )
         except Exception as e:
             raise Exception(f"Error generating meal plan: {str(e)}")
+
+    async def _agenerate(self, cache_key: str, validated_pet_data: Dict, breed_profile: Dict, food_journal: Optional[List[Dict]], existing_recipes: Optional[List[str]]) -> Dict:
+        feeding_targets: Dict = self.calorie_engine.calculate(validated_pet_data)
+        titles: RecipeTitleIndex = RecipeTitleIndex(existing_recipes or [])
+        inputs, metadata = self._prompt_inputs(validated_pet_data, feeding_targets, food_journal, titles, breed_profile)
+        tags: Dict = profile_tags(validated_pet_data, metadata["breedProfile"])
+        library_recipes: Optional[List[Dict]] = await self._library_recipes(validated_pet_data, tags, food_journal, titles)
+        async with self.admission.admit():
+            if library_recipes is not None or self.parallel_sections:
+                meal_plan, repaired = await self._agenerate_sections(
+                    inputs, self._section_groups(library_recipes),
+                    {"ingredients": library_recipes} if library_recipes is not None else None
+                )
+            else:
+                response: str = await self._ainvoke(inputs)
+                meal_plan, repaired = await self._acomplete_meal_plan(inputs, response)
+            regenerated: List[int] = await self._aunique_recipes(inputs, meal_plan["ingredients"], titles)
+        if self.recipe_library is not None:
+            await self._update_library(validated_pet_data["species"], tags, meal_plan["ingredients"], library_recipes is not None)
+
+        meal_plan = self._check_feeding_targets(meal_plan, feeding_targets)
+        meal_plan["metadata"] = {
+            **metadata, "repairedSections": repaired, "regeneratedRecipes": regenerated,
+            "recipesFromLibrary": library_recipes is not None
+        }
+        self.cache.set(cache_key, meal_plan)
+        return meal_plan
+
+    async def _astream_answer(self, inputs: Dict, meal_plan: Dict, chain: Optional[Callable[[OllamaBackend], Any]] = None) -> AsyncIterator[Tuple[str, Any]]:
+        # Sections of a single answer, each sent as soon as it is complete
+        parser = JSONSectionStream()
+        # The answer is read in a task of its own, so the backend is released
+        # as soon as Ollama is done, however slowly the client reads, and a
+        # failed connection is retried on another backend
+        chunks: asyncio.Queue = asyncio.Queue()
+        reader = asyncio.ensure_future(self._ainvoke(inputs, chain, chunks.put_nowait))
+        reader.add_done_callback(lambda _: chunks.put_nowait(None))
+        try:
+            while True:
+                chunk: Optional[str] = await chunks.get()
+                if chunk is None:
+                    break
+                try:
+                    sections: List[Tuple[str, Any]] = parser.feed(chunk)
+                except json.JSONDecodeError:
+                    # The rest of the answer is generated again by the repair
+                    JSON_DECODE_FAILURES.inc()
+                    return
+                for section, value in sections:
+                    if section.endswith("]"):
+                        meal_plan.setdefault(section[:section.index("[")], []).append(value)
+                    else:
+                        meal_plan[section] = value
+                    yield section, value
+            await reader
+        finally:
+            if reader.done():
+                if not reader.cancelled():
+                    reader.exception()
+            else:
+                reader.cancel()
+
+    async def _astream_section_groups(self, inputs: Dict, meal_plan: Dict, groups: List[List[str]]) -> AsyncIterator[Tuple[str, Any]]:
+        # Section groups generated in parallel, each group sent as soon as its
+        # request finishes
+        tasks = [asyncio.ensure_future(self._agenerate_section_group(inputs, sections)) for sections in groups]
+        try:
+            for next_group in asyncio.as_completed(tasks):
+                sections, response = await next_group
+                valid, _invalid = validate_sections(repair_json(response), sections)
+                for name, value in valid.items():
+                    meal_plan[name] = value
+                    for section, item in self._sections(name, value):
+                        yield section, item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _sections(self, key: str, value: Any) -> List[Tuple[str, Any]]:
+        # Streamed form of a top-level key, lists are sent one item at a time
+        # and empty ones as they are
+        if isinstance(value, list) and value:
+            return [(f"{key}[{index}]", item) for index, item in enumerate(value)]
+        return [(key, value)]
+
+    async def astream_meal_plan(self, pet_data: Dict, food_journal: Optional[List[Dict]] = None, existing_recipes: Optional[List[str]] = None, use_cache: bool = True) -> AsyncIterator[Tuple[str, Any]]:
+        # Yields (section, value) pairs as soon as each top-level key of the
+        # response is complete, e.g. ("caloricIntake", "1000 kcal") or
+        # ("ingredients[0]", {...}) for every recipe
+        validated_pet_data = self._validate_pet_data(pet_data)
+
+        breed_profile: Dict = self._breed_profile(validated_pet_data)
+        cache_key: str = self._cache_key(validated_pet_data, breed_profile, food_journal, existing_recipes)
+        cached: Optional[Dict] = self._cached(cache_key, use_cache)
+        if cached is not None:
+            for key, value in cached.items():
+                for section, item in self._sections(key, value):
+                    yield section, item
+            return
+
+        feeding_targets: Dict = self.calorie_engine.calculate(validated_pet_data)
+        titles: RecipeTitleIndex = RecipeTitleIndex(existing_recipes or [])
+        inputs, metadata = self._prompt_inputs(validated_pet_data, feeding_targets, food_journal, titles, breed_profile)
+        meal_plan: Dict = {}
+        # Recipes are only sent once their title is known not to duplicate a
+        # saved one; held back recipes are generated again at the end
+        streamed_titles: RecipeTitleIndex = titles.copy()
+        sent_recipes: List[int] = []
+        tags: Dict = profile_tags(validated_pet_data, metadata["breedProfile"])
+        library_recipes: Optional[List[Dict]] = await self._library_recipes(validated_pet_data, tags, food_journal, titles)
+        if library_recipes is not None:
+            meal_plan["ingredients"] = library_recipes
+            for index, (section, value) in enumerate(self._sections("ingredients", library_recipes)):
+                streamed_titles.add(value["recipeName"])
+                sent_recipes.append(index)
+                yield section, value
+        try:
+            async with self.admission.admit():
+                answer: AsyncIterator[Tuple[str, Any]]
+                if self.parallel_sections:
+                    answer = self._astream_section_groups(inputs, meal_plan, self._section_groups(library_recipes))
+                elif library_recipes is not None:
+                    # Everything but the recipes in one answer, streamed as
+                    # it is generated like a full plan
+                    sections: List[str] = self._section_groups(library_recipes)[0]
+                    answer = self._astream_answer(
+                        {**inputs, "sections": ", ".join(sections)}, meal_plan,
+                        self._sections_chain(self.section_prompt, sections)
+                    )
+                else:
+                    answer = self._astream_answer(inputs, meal_plan)
+                async for section, value in answer:
+                    if section == "caloricIntake" and parse_kcal(value) != feeding_targets["dailyCalories"]:
+                        value = meal_plan[section] = feeding_targets["caloricIntake"]
+                    if section.startswith("ingredients["):
+                        if not isinstance(value, dict) or streamed_titles.collision(str(value.get("recipeName"))) is not None:
+                            continue
+                        streamed_titles.add(value["recipeName"])
+                        sent_recipes.append(int(section[len("ingredients["):-1]))
+                    yield section, value
+
+                # The sections sent so far stand; whatever was cut off or is
+                # invalid is generated again and sent after them
+                partial, missing = validate_sections(meal_plan)
+                meal_plan = self._check_feeding_targets(await self._arepair(inputs, partial, missing), feeding_targets)
+                kept: Tuple[int, ...] = () if "ingredients" in missing else tuple(sent_recipes)
+                regenerated: List[int] = await self._aunique_recipes(inputs, meal_plan["ingredients"], titles, kept)
+                for name in missing:
+                    if name != "ingredients":
+                        for section, value in self._sections(name, meal_plan[name]):
+                            yield section, value
+                for index, recipe in enumerate(meal_plan["ingredients"]):
+                    if index not in kept:
+                        yield f"ingredients[{index}]", recipe
+        except requests.exceptions.ConnectionError:
+            raise ConnectionError(
+                "Lost connection to Ollama service. Please ensure Ollama is running and accessible."
+            )
+
+        if self.recipe_library is not None:
+            await self._update_library(validated_pet_data["species"], tags, meal_plan["ingredients"], library_recipes is not None)
+        meal_plan["metadata"] = {
+            **metadata, "repairedSections": missing, "regeneratedRecipes": regenerated,
+            "recipesFromLibrary": library_recipes is not None
+        }
+        yield "metadata", meal_plan["metadata"]
+        self.cache.set(cache_key, meal_plan)
@@ -0,0 +1,118 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+import asyncio
+import math
+import time
+from llm_metrics import QUEUE_SECONDS
+
+
+class AdmissionRejected(Exception):
+    """Raised when the generation queue is full"""
+
+    status_code: int = 429
+
+    def __init__(self, retry_after: int, message: Optional[str] = None):
+        super().__init__(message or f"Too many meal plan requests in progress, retry in {retry_after} seconds")
+        self.retry_after: int = retry_after
+
+
+class AdmissionDraining(AdmissionRejected):
+    """Raised for new generations once the server is shutting down"""
+
+    status_code: int = 503
+
+    def __init__(self):
+        super().__init__(1, "Server is shutting down, retry the request")
+
+
+class AdmissionController:
+    """Bounded queue in front of the LLM: at most max_in_flight generations
+    run at once, at most max_queue wait, everything else is rejected"""
+
+    def __init__(self, max_in_flight: int = 4, max_queue: int = 16, initial_service_time: float = 20.0,
+                 ewma_alpha: float = 0.2):
+        self.max_in_flight: int = max_in_flight
+        self.max_queue: int = max_queue
+        # Assumed until the first generation finishes
+        self.initial_service_time: float = initial_service_time
+        self.service_time: Optional[float] = None
+        self.ewma_alpha: float = ewma_alpha
+        self.in_flight: int = 0
+        self.waiting: int = 0
+        self.admitted: int = 0
+        self.rejected: int = 0
+        # Set on shutdown: running and queued generations finish, new ones
+        # are turned away
+        self.draining: bool = False
+        # Created on first use so it belongs to the running event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def retry_after(self) -> int:
+        # Generations that have to finish before a new arrival gets a slot,
+        # processed max_in_flight at a time, at the observed service time
+        ahead: int = max(0, self.in_flight + self.waiting - self.max_in_flight + 1)
+        waves: int = math.ceil(ahead / self.max_in_flight)
+        service_time: float = self.service_time if self.service_time is not None else self.initial_service_time
+        return max(1, math.ceil(waves * service_time))
+
+    def check(self) -> None:
+        if self.draining:
+            self.rejected += 1
+            raise AdmissionDraining()
+        if self.in_flight + self.waiting >= self.max_in_flight + self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected(self.retry_after())
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        self.check()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        self.waiting += 1
+        queued: float = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+            QUEUE_SECONDS.observe(time.perf_counter() - queued)
+
+        self.in_flight += 1
+        self.admitted += 1
+        started: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+            elapsed: float = time.perf_counter() - started
+            if self.service_time is None:
+                self.service_time = elapsed
+            else:
+                self.service_time += self.ewma_alpha * (elapsed - self.service_time)
+
+    def start_drain(self) -> None:
+        self.draining = True
+
+    async def drain(self, timeout: float) -> bool:
+        """Stop admitting and wait up to timeout seconds for the running and
+        queued generations; False if some were still running"""
+        self.start_drain()
+        deadline: float = time.perf_counter() + timeout
+        while self.in_flight + self.waiting > 0:
+            if time.perf_counter() >= deadline:
+                return False
+            await asyncio.sleep(0.1)
+        return True
+
+    def stats(self) -> Dict:
+        return {
+            "inFlight": self.in_flight,
+            "waiting": self.waiting,
+            "maxInFlight": self.max_in_flight,
+            "maxQueue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "serviceTime": self.service_time,
+            "draining": self.draining,
+        }
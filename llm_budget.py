@@ -0,0 +1,9 @@
+import math
+
+# Rough token estimate for English prompt text with Mistral's tokenizer.
+# Deliberately on the high side so a budgeted prompt never overflows.
+CHARS_PER_TOKEN: float = 3.5
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
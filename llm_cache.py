@@ -0,0 +1,179 @@
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import math
+import threading
+import time
+from breed_profiles import LARGE_BREED_PUPPY_MAX_YEARS
+from calorie_engine import ADULT_AGE_YEARS, SENIOR_AGE_YEARS, YOUNG_AGE_YEARS, CalorieEngine
+
+# Pets of the same profile share cached plans: weights within about 5% of
+# each other and ages in the same life stage fall in the same band. The
+# daily calories and the breed profile are part of the key, so a shared
+# plan always has the requesting pet's calorie target and breed facts.
+WEIGHT_BAND_RATIO: float = 1.05
+AGE_BAND_YEARS: Tuple[float, ...] = tuple(sorted({
+    YOUNG_AGE_YEARS, ADULT_AGE_YEARS, LARGE_BREED_PUPPY_MAX_YEARS, *SENIOR_AGE_YEARS.values()
+}))
+# Fields that don't change the plan
+UNKEYED_FIELDS: Tuple[str, ...] = ("name",)
+
+_CALORIE_ENGINE: CalorieEngine = CalorieEngine()
+
+
+def _digest(value: Any) -> str:
+    canonical: str = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _normalize(value: Any) -> Any:
+    # "Labrador Retriever " and "labrador retriever", or 4 and "4.0", must
+    # produce the same key
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        stripped: str = value.strip()
+        try:
+            return float(stripped)
+        except ValueError:
+            return " ".join(stripped.casefold().split())
+    return value
+
+
+def weight_band(weight: float) -> int:
+    return round(math.log(weight) / math.log(WEIGHT_BAND_RATIO))
+
+
+def age_band(age: float) -> int:
+    return bisect_right(AGE_BAND_YEARS, age)
+
+
+def meal_plan_cache_key(pet_data: Dict, breed_profile: Dict, food_journal: Optional[List[Dict]],
+                        existing_recipes: Optional[List[str]], template_digest: str, model_name: str) -> str:
+    # Expects validated pet data, with a positive weight, and its breed
+    # profile; size class, weight status and the notes that follow from them
+    # depend on the exact weight and go in the prompt as they are
+    normalized_pet_data: Dict = {
+        key: _normalize(value) for key, value in pet_data.items() if key not in UNKEYED_FIELDS
+    }
+    normalized_pet_data["weight"] = weight_band(float(pet_data["weight"]))
+    normalized_pet_data["age"] = age_band(float(pet_data["age"]))
+    normalized_pet_data["dailyCalories"] = _CALORIE_ENGINE.calculate(pet_data)["dailyCalories"]
+    recipes: List[str] = sorted({_normalize(title) for title in existing_recipes or []})
+    return _digest({
+        "pet": normalized_pet_data,
+        "breedProfile": breed_profile,
+        "journal": _digest(food_journal or []),
+        "recipes": _digest(recipes),
+        "template": template_digest,
+        "model": model_name,
+    })
+
+
+class MealPlanCache:
+    """Size-bounded LRU cache with per-entry TTL for generated meal plans"""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 3600):
+        self.max_size: int = max_size
+        self.ttl: float = ttl
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        # Cached plans are shared between requests and must not be mutated
+        with self._lock:
+            entry: Optional[Tuple[float, Dict]] = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def contains(self, key: str) -> bool:
+        # A live entry for the key, without counting a lookup
+        with self._lock:
+            entry: Optional[Tuple[float, Dict]] = self._entries.get(key)
+            return entry is not None and entry[0] >= time.monotonic()
+
+    def set(self, key: str, value: Dict) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups: int = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxSize": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hitRate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into a single execution"""
+
+    def __init__(self):
+        self.executions: int = 0
+        self.coalesced: int = 0
+        self._flights: Dict[str, "asyncio.Future"] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        flight: Optional["asyncio.Future"] = self._flights.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(fn())
+            self._flights[key] = flight
+            flight.add_done_callback(lambda done: self._finish(key, done))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+
+        # Shielded so a caller that disconnects doesn't cancel the generation
+        # the other callers are waiting on
+        return await asyncio.shield(flight)
+
+    def _finish(self, key: str, flight: "asyncio.Future") -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Mark the exception as retrieved in case every caller went away
+        if not flight.cancelled():
+            flight.exception()
+
+    def stats(self) -> Dict:
+        return {
+            "inFlight": len(self._flights),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,66 @@
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+from typing import Dict, Tuple
+import os
+
+# Prometheus metrics of the meal plan generation. Label values are bound
+# once here, so recording on the hot path is a lock and an add.
+
+STAGE_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0,
+)
+TOKENS_PER_SECOND_BUCKETS: Tuple[float, ...] = (
+    1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 50.0, 75.0, 100.0, 200.0, 500.0, 1000.0, 2500.0, 5000.0,
+)
+
+STAGE_SECONDS = Histogram(
+    "meal_plan_stage_seconds", "Time spent per stage of a meal plan generation", ["stage"], buckets=STAGE_BUCKETS
+)
+VALIDATION_SECONDS = STAGE_SECONDS.labels(stage="validation")
+PROMPT_SECONDS = STAGE_SECONDS.labels(stage="prompt")
+QUEUE_SECONDS = STAGE_SECONDS.labels(stage="queue")
+PROMPT_EVAL_SECONDS = STAGE_SECONDS.labels(stage="prompt_eval")
+GENERATION_SECONDS = STAGE_SECONDS.labels(stage="generation")
+PARSING_SECONDS = STAGE_SECONDS.labels(stage="parsing")
+
+CACHE_LOOKUPS = Counter("meal_plan_cache_lookups", "Meal plan cache lookups", ["result"])
+CACHE_HITS = CACHE_LOOKUPS.labels(result="hit")
+CACHE_MISSES = CACHE_LOOKUPS.labels(result="miss")
+VALIDATION_FAILURES = Counter("meal_plan_validation_failures", "Requests rejected for invalid pet data")
+JSON_DECODE_FAILURES = Counter("meal_plan_json_decode_failures", "Model answers that were not valid JSON")
+
+# Ollama's own counts and timings of every request
+PROMPT_TOKENS = Counter("ollama_prompt_tokens", "Prompt tokens evaluated by Ollama")
+GENERATED_TOKENS = Counter("ollama_generated_tokens", "Tokens generated by Ollama")
+TOKENS_PER_SECOND = Histogram(
+    "ollama_tokens_per_second", "Ollama throughput per request", ["phase"], buckets=TOKENS_PER_SECOND_BUCKETS
+)
+PROMPT_TOKENS_PER_SECOND = TOKENS_PER_SECOND.labels(phase="prompt")
+GENERATION_TOKENS_PER_SECOND = TOKENS_PER_SECOND.labels(phase="generation")
+
+
+def record_ollama_stats(info: Dict) -> None:
+    """Record the counts and durations (in ns) of Ollama's final response"""
+    prompt_tokens: int = info.get("prompt_eval_count") or 0
+    prompt_seconds: float = (info.get("prompt_eval_duration") or 0) / 1e9
+    generated_tokens: int = info.get("eval_count") or 0
+    generation_seconds: float = (info.get("eval_duration") or 0) / 1e9
+    PROMPT_TOKENS.inc(prompt_tokens)
+    GENERATED_TOKENS.inc(generated_tokens)
+    # A prompt served entirely from Ollama's cache has no duration
+    if prompt_seconds > 0:
+        PROMPT_EVAL_SECONDS.observe(prompt_seconds)
+        PROMPT_TOKENS_PER_SECOND.observe(prompt_tokens / prompt_seconds)
+    if generation_seconds > 0:
+        GENERATION_SECONDS.observe(generation_seconds)
+        GENERATION_TOKENS_PER_SECOND.observe(generated_tokens / generation_seconds)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    # With several workers every process writes its metrics to
+    # PROMETHEUS_MULTIPROC_DIR and a scrape adds them up
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
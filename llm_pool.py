@@ -0,0 +1,134 @@
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set, Union
+import threading
+import time
+import httpx
+import requests.exceptions
+
+# Errors meaning the backend could not be reached at all, so the request can
+# safely be retried on another backend
+CONNECTION_ERRORS = (ConnectionError, requests.exceptions.ConnectionError, httpx.ConnectError, httpx.ConnectTimeout)
+
+
+class OllamaBackend:
+    def __init__(self, base_url: str, model: Any):
+        self.base_url: str = base_url
+        self.model = model
+        # Runnable chain bound to this backend's model, set by PetNutritionLLM
+        self.chain = None
+        self.outstanding: int = 0
+        self.requests: int = 0
+        self.failures: int = 0
+        self.consecutive_failures: int = 0
+        self.ejections: int = 0
+        self.ejected_until: float = 0.0
+        self.total_latency: float = 0.0
+        self.ewma_latency: Optional[float] = None
+        self.max_latency: float = 0.0
+        # Set once a warm-up has loaded the model into the server's memory
+        self.resident: bool = False
+        self.warmup_seconds: Optional[float] = None
+
+    async def awarm_up(self, model_name: str, keep_alive: Union[int, str], timeout: float) -> bool:
+        """Load the model into Ollama's memory and check that it stays resident"""
+        started: float = time.perf_counter()
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=timeout) as client:
+            # A generate request without a prompt only loads the model
+            response = await client.post("/api/generate", json={"model": model_name, "keep_alive": keep_alive})
+            response.raise_for_status()
+            running = await client.get("/api/ps")
+            running.raise_for_status()
+        names: Set[str] = {model.get("name") for model in running.json().get("models", [])}
+        self.resident = model_name in names or f"{model_name}:latest" in names
+        if self.resident:
+            self.warmup_seconds = time.perf_counter() - started
+        return self.resident
+
+    def stats(self) -> Dict:
+        successes: int = self.requests - self.failures
+        return {
+            "baseUrl": self.base_url,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "ejections": self.ejections,
+            "ejected": self.ejected_until > time.monotonic(),
+            "meanLatency": self.total_latency / successes if successes else None,
+            "ewmaLatency": self.ewma_latency,
+            "maxLatency": self.max_latency,
+            "resident": self.resident,
+            "warmupSeconds": self.warmup_seconds,
+        }
+
+
+class OllamaBackendPool:
+    """Routes each generation to the healthy backend with the fewest outstanding requests"""
+
+    def __init__(self, backends: List[OllamaBackend], max_failures: int = 3, ejection_seconds: float = 30.0,
+                 ewma_alpha: float = 0.3):
+        if not backends:
+            raise ValueError("At least one Ollama backend is required")
+        self.backends: List[OllamaBackend] = backends
+        self.max_failures: int = max_failures
+        self.ejection_seconds: float = ejection_seconds
+        self.ewma_alpha: float = ewma_alpha
+        self._lock: threading.Lock = threading.Lock()
+
+    def _select(self, exclude: Set[str]) -> OllamaBackend:
+        now: float = time.monotonic()
+        candidates: List[OllamaBackend] = [b for b in self.backends if b.base_url not in exclude] or self.backends
+        healthy: List[OllamaBackend] = [b for b in candidates if b.ejected_until <= now]
+        if not healthy:
+            # Everything is ejected: fail open to the backend that comes back first
+            return min(candidates, key=lambda b: b.ejected_until)
+        # Ties go to the backend that has been answering faster
+        return min(healthy, key=lambda b: (b.outstanding, b.ewma_latency or 0.0))
+
+    @contextmanager
+    def acquire(self, exclude: Optional[Set[str]] = None) -> Iterator[OllamaBackend]:
+        with self._lock:
+            backend: OllamaBackend = self._select(exclude or set())
+            backend.outstanding += 1
+            backend.requests += 1
+        started: float = time.perf_counter()
+
+        try:
+            yield backend
+        except Exception:
+            with self._lock:
+                backend.outstanding -= 1
+                self._record_failure(backend)
+            raise
+        except BaseException:
+            # Cancelled or abandoned by the caller, says nothing about the backend
+            with self._lock:
+                backend.outstanding -= 1
+                backend.requests -= 1
+            raise
+        else:
+            with self._lock:
+                backend.outstanding -= 1
+                self._record_success(backend, time.perf_counter() - started)
+
+    def _record_success(self, backend: OllamaBackend, latency: float) -> None:
+        backend.consecutive_failures = 0
+        backend.total_latency += latency
+        backend.max_latency = max(backend.max_latency, latency)
+        if backend.ewma_latency is None:
+            backend.ewma_latency = latency
+        else:
+            backend.ewma_latency += self.ewma_alpha * (latency - backend.ewma_latency)
+
+    def _record_failure(self, backend: OllamaBackend) -> None:
+        # Passive health check: repeated failures take the backend out of
+        # rotation for a while, then it gets traffic again
+        backend.failures += 1
+        backend.consecutive_failures += 1
+        if backend.consecutive_failures >= self.max_failures:
+            backend.ejected_until = time.monotonic() + self.ejection_seconds
+            backend.ejections += 1
+            backend.consecutive_failures = 0
+
+    def stats(self) -> List[Dict]:
+        with self._lock:
+            return [backend.stats() for backend in self.backends]
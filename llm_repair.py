@@ -0,0 +1,82 @@
+from typing import Any, Dict, List, Tuple
+import orjson
+
+_WHITESPACE: str = " \t\r\n"
+
+
+def repair_json(text: str) -> Dict[str, Any]:
+    """Parses a JSON object that may be cut off, keeping every value that was
+    complete and closing the strings, arrays and objects still open"""
+    start: int = text.find("{")
+    if start < 0:
+        return {}
+
+    # Closing characters of the open containers and what each one expects
+    # next: "key", "colon", "value" or "comma"
+    closers: List[str] = []
+    expects: List[str] = []
+    in_string: bool = False
+    escape: bool = False
+    string_is_key: bool = False
+    in_scalar: bool = False
+    # Last point where the text can be cut and closed into valid JSON.
+    # A value cut off half way, or a key without its value, is dropped: a
+    # truncated sentence or number would look valid but be wrong.
+    cut: Tuple[int, str] = (start, "")
+
+    def value_done(end: int) -> Tuple[int, str]:
+        expects[-1] = "comma"
+        return end, "".join(reversed(closers))
+
+    for i in range(start, len(text)):
+        char: str = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+                if string_is_key:
+                    expects[-1] = "colon"
+                else:
+                    cut = value_done(i + 1)
+            continue
+
+        if in_scalar:
+            if char not in _WHITESPACE and char not in ",}]":
+                continue
+            in_scalar = False
+            cut = value_done(i)
+
+        if char in "{[":
+            closers.append("}" if char == "{" else "]")
+            expects.append("key" if char == "{" else "value")
+            # An empty container is a complete value
+            cut = (i + 1, "".join(reversed(closers)))
+        elif char in "}]":
+            closers.pop()
+            expects.pop()
+            if not closers:
+                # The whole object arrived
+                cut = (i + 1, "")
+                break
+            cut = value_done(i + 1)
+        elif char == '"':
+            in_string = True
+            string_is_key = expects[-1] == "key"
+        elif char == ":":
+            expects[-1] = "value"
+        elif char == ",":
+            expects[-1] = "key" if closers[-1] == "}" else "value"
+        elif char not in _WHITESPACE:
+            in_scalar = True
+
+    end, closing = cut
+    if end == start:
+        return {}
+    try:
+        repaired = orjson.loads(text[start:end] + closing)
+    except orjson.JSONDecodeError:
+        return {}
+    return repaired if isinstance(repaired, dict) else {}
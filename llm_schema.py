@@ -0,0 +1,100 @@
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from typing import Any, Dict, List, Optional, Tuple
+from typing_extensions import Annotated
+
+# Every text field has to be filled in, which the prompt asks for and the
+# schema now enforces while the model is generating
+Text = Annotated[str, Field(min_length=1)]
+
+RECIPES_PER_PLAN: int = 2
+
+
+class MealPlan(BaseModel):
+    breakfast: Text
+    lunch: Text
+    dinner: Text
+    snacks: Text
+
+
+class NutritionBalance(BaseModel):
+    protein: Text
+    fat: Text
+    carbs: Text
+    fiber: Text
+    moisture: Text
+
+
+class Recipe(BaseModel):
+    recipeName: Text
+    ingredients: List[Text] = Field(min_length=1)
+    preparation: List[Text] = Field(min_length=1)
+    description: Text
+
+
+class FeedingGuidelines(BaseModel):
+    frequency: Text
+    portionControl: Text
+    waterIntake: Text
+    feedingTips: Text
+
+
+class MealPlanResponse(BaseModel):
+    """The JSON structure the model has to answer with"""
+
+    caloricIntake: Text
+    mealPlan: MealPlan
+    nutritionBalance: NutritionBalance
+    warnings: Text
+    ingredients: List[Recipe] = Field(min_length=RECIPES_PER_PLAN, max_length=RECIPES_PER_PLAN)
+    feedingGuidelines: FeedingGuidelines
+    supplements: Text
+    foodsToAvoid: Text
+    transitionGuidelines: Text
+
+
+# Passed as Ollama's "format" option, so decoding is constrained to this
+# structure; an answer can still be cut off by the token limit or a timeout
+MEAL_PLAN_SCHEMA: Dict[str, Any] = MealPlanResponse.model_json_schema()
+
+# Schema and validator for a single recipe, used when one recipe of a plan
+# has to be generated again
+RECIPE_SCHEMA: Dict[str, Any] = Recipe.model_json_schema()
+RECIPE_ADAPTER: TypeAdapter = TypeAdapter(Recipe)
+
+# One validator per top-level section, so a partial answer can be checked
+# section by section and only the broken ones asked for again
+SECTION_ADAPTERS: Dict[str, TypeAdapter] = {
+    name: TypeAdapter(Annotated[(field.annotation, *field.metadata)] if field.metadata else field.annotation)
+    for name, field in MealPlanResponse.model_fields.items()
+}
+
+
+def validate_sections(data: Dict, sections: Optional[List[str]] = None) -> Tuple[Dict, List[str]]:
+    """Returns the valid sections and the names of the missing or invalid ones, in schema order"""
+    valid: Dict = {}
+    missing: List[str] = []
+    for name in sections or SECTION_ADAPTERS:
+        try:
+            valid[name] = SECTION_ADAPTERS[name].dump_python(SECTION_ADAPTERS[name].validate_python(data[name]))
+        except (KeyError, ValidationError):
+            missing.append(name)
+    return valid, missing
+
+
+def section_schema(sections: List[str]) -> Dict[str, Any]:
+    # Response schema for an answer made of only these sections
+    schema: Dict[str, Any] = {
+        "type": "object",
+        "properties": {name: MEAL_PLAN_SCHEMA["properties"][name] for name in sections},
+        "required": list(sections),
+    }
+    if "$defs" in MEAL_PLAN_SCHEMA:
+        schema["$defs"] = MEAL_PLAN_SCHEMA["$defs"]
+    return schema
+
+# Independent parts of the meal plan that can be generated in parallel
+SECTION_GROUPS: List[List[str]] = [
+    ["caloricIntake", "mealPlan", "nutritionBalance", "warnings"],
+    ["ingredients"],
+    ["feedingGuidelines", "supplements", "foodsToAvoid", "transitionGuidelines"],
+]
@@ -0,0 +1,127 @@
+import orjson
+from typing import Any, List, Optional, Tuple
+
+
+class JSONSectionStream:
+    """Incremental parser that emits top-level JSON members as soon as they close"""
+
+    def __init__(self):
+        self.text: str = ""
+        self.done: bool = False
+        self._pos: int = 0
+        self._depth: int = 0
+        self._in_string: bool = False
+        self._escape: bool = False
+
+        # State of the root object members: key -> colon -> value -> in_value -> after
+        self._state: str = "key"
+        self._key: Optional[str] = None
+        self._key_start: int = 0
+        self._value_start: int = 0
+
+        # Top-level arrays (like ingredients) are emitted element by element,
+        # empty ones as a whole
+        self._array_key: Optional[str] = None
+        self._item_state: str = "item"
+        self._item_start: int = 0
+        self._item_index: int = 0
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self.text += chunk
+        sections: List[Tuple[str, Any]] = []
+        text: str = self.text
+
+        i: int = self._pos
+        while i < len(text) and not self.done:
+            char: str = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._state == "key":
+                        self._key = orjson.loads(text[self._key_start:i + 1])
+                        self._state = "colon"
+                i += 1
+                continue
+
+            if self._depth == 0:
+                # Skip anything before the root object, e.g. ```json fences
+                if char == "{":
+                    self._depth = 1
+                    self._state = "key"
+                i += 1
+                continue
+
+            if char in " \t\r\n":
+                i += 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._state == "key":
+                    self._key_start = i
+                else:
+                    self._start_value(i)
+            elif char in "{[":
+                self._start_value(i)
+                if self._depth == 1 and char == "[":
+                    self._array_key = self._key
+                    self._item_state = "item"
+                    self._item_index = 0
+                self._depth += 1
+            elif char in "}]":
+                self._close_scalar(i, sections)
+                self._depth -= 1
+                if self._depth == 0:
+                    self.done = True
+                elif self._depth == 1 and self._state == "in_value":
+                    if self._array_key is None:
+                        sections.append((self._key, orjson.loads(text[self._value_start:i + 1])))
+                    elif self._item_index == 0:
+                        # An empty array has no items to stand for it
+                        sections.append((self._key, []))
+                    self._array_key = None
+                    self._state = "after"
+                elif self._depth == 2 and self._array_key is not None and self._item_state == "in_item":
+                    self._emit_item(text[self._item_start:i + 1], sections)
+            elif char == ":":
+                if self._depth == 1 and self._state == "colon":
+                    self._state = "value"
+            elif char == ",":
+                self._close_scalar(i, sections)
+                if self._depth == 1:
+                    self._state = "key"
+                elif self._depth == 2 and self._array_key is not None:
+                    self._item_state = "item"
+            else:
+                # Start of a number, true, false or null
+                self._start_value(i)
+            i += 1
+
+        self._pos = i
+        return sections
+
+    def _start_value(self, index: int) -> None:
+        if self._depth == 1 and self._state == "value":
+            self._value_start = index
+            self._state = "in_value"
+        elif self._depth == 2 and self._array_key is not None and self._item_state == "item":
+            self._item_start = index
+            self._item_state = "in_item"
+
+    def _close_scalar(self, index: int, sections: List[Tuple[str, Any]]) -> None:
+        # Scalars have no closing bracket, they end at the next ',' or '}' / ']'
+        if self._depth == 1 and self._state == "in_value":
+            sections.append((self._key, orjson.loads(self.text[self._value_start:index])))
+            self._state = "after"
+        elif self._depth == 2 and self._array_key is not None and self._item_state == "in_item":
+            self._emit_item(self.text[self._item_start:index], sections)
+
+    def _emit_item(self, raw: str, sections: List[Tuple[str, Any]]) -> None:
+        sections.append((f"{self._array_key}[{self._item_index}]", orjson.loads(raw)))
+        self._item_index += 1
+        self._item_state = "after"
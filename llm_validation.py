@@ -1,57 +1,180 @@
-from typing import Dict, List, Set
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Mapping, Optional, Tuple
 import re
 
+# Common dog breeds
+DOG_BREEDS: FrozenSet[str] = frozenset({
+    "Affenpinscher", "American Bulldog", "English Setter", "English Shepherd", "English Springer Spaniel", "English Toy Spaniel", "English Toy Terrier", "Eurasier", "Field Spaniel", 
+    "American Bully", "Finnish Lapphund", "Finnish Spitz", "French Bulldog", "German Pinscher", "German Shepherd Dog", "German Shorthaired Pointer", "Giant Schnauzer", "American Eskimo Dog", 
+    "Glen of Imaal Terrier", "Golden Retriever", "Gordon Setter", "Great Dane", "Great Pyrenees", "Greyhound", "Griffon Bruxellois", "Harrier", "American Eskimo Dog (Miniature)", "Havanese", 
+    "Irish Setter", "Irish Terrier", "Irish Wolfhound", "Italian Greyhound", "American Foxhound", "Japanese Chin", "Japanese Spitz", "Keeshond", "Komondor", "Kooikerhondje", "Kuvasz", 
+    "Labrador Retriever", "American Pit Bull Terrier", "Lagotto Romagnolo", "Lancashire Heeler", "Leonberger", "Poodle (Toy)", "Lhasa Apso", "American Staffordshire Terrier", "Maltese", 
+    "Miniature American Shepherd", "Miniature Pinscher", "Miniature Schnauzer", "American Water Spaniel", "Newfoundland", "Norfolk Terrier", "Norwich Terrier", "Nova Scotia Duck Tolling Retriever", 
+    "Old English Sheepdog", "Olde English Bulldogge", "Anatolian Shepherd Dog", "Papillon", "Pekingese", "Pembroke Welsh Corgi", "Perro de Presa Canario", "Pharaoh Hound", "Plott", "Appenzeller Sennenhund", 
+    "Pomeranian", "Poodle (Miniature)", "Afghan Hound", "Australian Cattle Dog", "Pug", "Puli", "Pumi", "Rat Terrier", "Redbone Coonhound", "Rhodesian Ridgeback", "Australian Kelpie", "Rottweiler", 
+    "Russian Toy", "Saint Bernard", "Saluki", "Samoyed", "Schipperke", "Scottish Deerhound", "Scottish Terrier", "Australian Shepherd", "Shetland Sheepdog", "Shiba Inu", "Shih Tzu", "Shiloh Shepherd", 
+    "Siberian Husky", "Silky Terrier", "Australian Terrier", "Smooth Fox Terrier", "Soft Coated Wheaten Terrier", "Spanish Water Dog", "Spinone Italiano", "Staffordshire Bull Terrier", "Standard Schnauzer", 
+    "Azawakh", "Swedish Vallhund", "Thai Ridgeback", "Tibetan Mastiff", "Tibetan Spaniel", "Tibetan Terrier", "Toy Fox Terrier", "Barbet", "Treeing Walker Coonhound", "Vizsla", "Weimaraner", "Welsh Springer Spaniel", 
+    "Whippet", "West Highland White Terrier", "Akbash Dog", "White Shepherd", "Wire Fox Terrier", "Basenji", "Wirehaired Pointing Griffon", "Wirehaired Vizsla", "Xoloitzcuintli", "Yorkshire Terrier", 
+    "Basset Bleu de Gascogne", "African Hunting Dog", "Basset Hound", "Beagle", "Bearded Collie", "Beauceron", "Bedlington Terrier", "Belgian Malinois", "Belgian Tervuren", "Airedale Terrier", 
+    "Bernese Mountain Dog", "Bichon Frise", "Black and Tan Coonhound", "Bloodhound", "Bluetick Coonhound", "Boerboel", "Border Collie", "Border Terrier", "Boston Terrier", "Bouvier des Flandres", "Boxer", 
+    "Boykin Spaniel", "Bracco Italiano", "Briard", "Brittany", "Akita", "Bull Terrier", "Bullmastiff", "Cairn Terrier", "Cane Corso", "Cardigan Welsh Corgi", "Catahoula Leopard Dog", "Alapaha Blue Blood Bulldog", 
+    "Caucasian Shepherd (Ovcharka)", "Cavalier King Charles Spaniel", "Chesapeake Bay Retriever", "Chinese Crested", "Chinese Shar-Pei", "Alaskan Husky", "Chinook", "Chow Chow", "Clumber Spaniel", "Cocker Spaniel", 
+    "Cocker Spaniel (American)", "Coton de Tulear", "Alaskan Malamute", "Dalmatian", "Doberman Pinscher", "Dogo Argentino", "Dutch Shepherd", "Mix Breed"
+})
+
+# Common cat breeds
+CAT_BREEDS: FrozenSet[str] = frozenset({
+    "American Bobtail", "Abyssinian", "American Curl", "Aegean", "Arabian Mau", "Australian Mist", "American Shorthair", "American Wirehair", "Balinese", "Bambino", "Bengal", 
+    "Birman", "Bombay", "British Shorthair", "British Longhair", "Burmese", "Burmilla", "Chartreux", "Chausie", "Cheetoh", "Cornish Rex", "Colorpoint Shorthair", "California Spangled", 
+    "Chantilly-Tiffany", "Cymric", "Cyprus", "Donskoy", "Devon Rex", "Siberian", "European Burmese", "Egyptian Mau", "Exotic Shorthair", "Havana Brown", "Himalayan", "Javanese", 
+    "Japanese Bobtail", "Khao Manee", "Korat", "Kurilian", "LaPerm", "Dragon Li", "Malayan", "Manx", "Maine Coon", "Mix Breed", "Munchkin", "Nebelung", "Norwegian Forest Cat", 
+    "Ocicat", "Oriental", "Persian", "Pixie-bob", "Ragamuffin", "Ragdoll", "Russian Blue", "Savannah", "Scottish Fold", "Siamese", "Singapura", "Snowshoe", "Somali", "Sphynx", 
+    "Selkirk Rex", "Turkish Angora", "Tonkinese", "Toyger", "Turkish Van", "York Chocolate"
+})
+
+# Names owners commonly use for a breed, resolved to the listed breed
+DOG_BREED_ALIASES: Dict[str, str] = {
+    "Lab": "Labrador Retriever",
+    "Labrador": "Labrador Retriever",
+    "Golden": "Golden Retriever",
+    "German Shepherd": "German Shepherd Dog",
+    "GSD": "German Shepherd Dog",
+    "Alsatian": "German Shepherd Dog",
+    "Frenchie": "French Bulldog",
+    "Yorkie": "Yorkshire Terrier",
+    "Westie": "West Highland White Terrier",
+    "Sheltie": "Shetland Sheepdog",
+    "Aussie": "Australian Shepherd",
+    "Husky": "Siberian Husky",
+    "Doberman": "Doberman Pinscher",
+    "Dobermann": "Doberman Pinscher",
+    "Pit Bull": "American Pit Bull Terrier",
+    "Pitbull": "American Pit Bull Terrier",
+    "Staffy": "Staffordshire Bull Terrier",
+    "Staffie": "Staffordshire Bull Terrier",
+    "Cavalier": "Cavalier King Charles Spaniel",
+    "Shar Pei": "Chinese Shar-Pei",
+    "Berner": "Bernese Mountain Dog",
+    "Pyrenees": "Great Pyrenees",
+    "St Bernard": "Saint Bernard",
+    "Malinois": "Belgian Malinois",
+    "Mini Schnauzer": "Miniature Schnauzer",
+    "Min Pin": "Miniature Pinscher",
+    "Toy Poodle": "Poodle (Toy)",
+    "Miniature Poodle": "Poodle (Miniature)",
+    "Mini Poodle": "Poodle (Miniature)",
+    "Mixed": "Mix Breed",
+    "Mixed Breed": "Mix Breed",
+    "Mutt": "Mix Breed",
+}
+
+CAT_BREED_ALIASES: Dict[str, str] = {
+    "Sphinx": "Sphynx",
+    "Norwegian Forest": "Norwegian Forest Cat",
+    "Wegie": "Norwegian Forest Cat",
+    "Maine Coon Cat": "Maine Coon",
+    "Ragdoll Cat": "Ragdoll",
+    "Siamese Cat": "Siamese",
+    "Persian Cat": "Persian",
+    "Bengal Cat": "Bengal",
+    "British Blue": "British Shorthair",
+    "Domestic Shorthair": "Mix Breed",
+    "Domestic Longhair": "Mix Breed",
+    "Domestic Medium Hair": "Mix Breed",
+    "DSH": "Mix Breed",
+    "DLH": "Mix Breed",
+    "Moggy": "Mix Breed",
+    "Mixed": "Mix Breed",
+    "Mixed Breed": "Mix Breed",
+}
+
+# Minimum trigram similarity for a breed to be suggested on a miss
+BREED_SUGGESTION_SIMILARITY: float = 0.3
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_breed(breed: str) -> str:
+    # Case, punctuation and spacing don't matter: "shih-tzu" is "Shih Tzu"
+    return _NON_ALNUM.sub(" ", str(breed).casefold()).strip()
+
+
+def _trigrams(key: str) -> FrozenSet[str]:
+    text: str = f" {key} "
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+
+class BreedIndex:
+    """Breeds of one species, normalized once, with aliases and fuzzy suggestions"""
+
+    def __init__(self, breeds: FrozenSet[str], aliases: Dict[str, str]):
+        names: Dict[str, str] = {normalize_breed(breed): breed for breed in breeds}
+        for alias, breed in aliases.items():
+            names.setdefault(normalize_breed(alias), breed)
+        postings: Dict[str, List[str]] = {}
+        for key in names:
+            for gram in _trigrams(key):
+                postings.setdefault(gram, []).append(key)
+
+        self.breeds: FrozenSet[str] = breeds
+        # Normalized breed or alias -> listed breed
+        self._names: Mapping[str, str] = MappingProxyType(names)
+        self._trigrams: Mapping[str, FrozenSet[str]] = MappingProxyType({key: _trigrams(key) for key in names})
+        self._postings: Mapping[str, Tuple[str, ...]] = MappingProxyType(
+            {gram: tuple(keys) for gram, keys in postings.items()}
+        )
+
+    def resolve(self, breed: str) -> Optional[str]:
+        """The listed breed for a breed name or alias, None if unknown"""
+        return self._names.get(normalize_breed(breed))
+
+    def suggest(self, breed: str) -> Optional[str]:
+        """The listed breed closest to an unknown name, None if nothing is close"""
+        grams: FrozenSet[str] = _trigrams(normalize_breed(breed))
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for key in self._postings.get(gram, ()):
+                shared[key] = shared.get(key, 0) + 1
+        best: Optional[str] = None
+        best_similarity: float = BREED_SUGGESTION_SIMILARITY
+        for key, count in shared.items():
+            similarity: float = count / (len(grams) + len(self._trigrams[key]) - count)
+            if similarity > best_similarity:
+                best, best_similarity = key, similarity
+        return self._names[best] if best is not None else None
+
+
+# Built once at import and shared by every validator
+BREED_INDEX: Mapping[str, BreedIndex] = MappingProxyType({
+    "dog": BreedIndex(DOG_BREEDS, DOG_BREED_ALIASES),
+    "cat": BreedIndex(CAT_BREEDS, CAT_BREED_ALIASES),
+})
+
+
 class PetValidationError(Exception):
     """Custom exception for pet data validation errors"""
-    pass
+
+    def __init__(self, message: str, suggestions: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        # Field -> suggested value, e.g. {"breed": "Labrador Retriever"}
+        self.suggestions: Dict[str, str] = suggestions or {}
 
 class PetDataValidator:
     def __init__(self):
-        # Common dog breeds
-        self.dog_breeds: Set[str] = {
-            "Affenpinscher", "American Bulldog", "English Setter", "English Shepherd", "English Springer Spaniel", "English Toy Spaniel", "English Toy Terrier", "Eurasier", "Field Spaniel", 
-            "American Bully", "Finnish Lapphund", "Finnish Spitz", "French Bulldog", "German Pinscher", "German Shepherd Dog", "German Shorthaired Pointer", "Giant Schnauzer", "American Eskimo Dog", 
-            "Glen of Imaal Terrier", "Golden Retriever", "Gordon Setter", "Great Dane", "Great Pyrenees", "Greyhound", "Griffon Bruxellois", "Harrier", "American Eskimo Dog (Miniature)", "Havanese", 
-            "Irish Setter", "Irish Terrier", "Irish Wolfhound", "Italian Greyhound", "American Foxhound", "Japanese Chin", "Japanese Spitz", "Keeshond", "Komondor", "Kooikerhondje", "Kuvasz", 
-            "Labrador Retriever", "American Pit Bull Terrier", "Lagotto Romagnolo", "Lancashire Heeler", "Leonberger", "Poodle (Toy)", "Lhasa Apso", "American Staffordshire Terrier", "Maltese", 
-            "Miniature American Shepherd", "Miniature Pinscher", "Miniature Schnauzer", "American Water Spaniel", "Newfoundland", "Norfolk Terrier", "Norwich Terrier", "Nova Scotia Duck Tolling Retriever", 
-            "Old English Sheepdog", "Olde English Bulldogge", "Anatolian Shepherd Dog", "Papillon", "Pekingese", "Pembroke Welsh Corgi", "Perro de Presa Canario", "Pharaoh Hound", "Plott", "Appenzeller Sennenhund", 
-            "Pomeranian", "Poodle (Miniature)", "Afghan Hound", "Australian Cattle Dog", "Pug", "Puli", "Pumi", "Rat Terrier", "Redbone Coonhound", "Rhodesian Ridgeback", "Australian Kelpie", "Rottweiler", 
-            "Russian Toy", "Saint Bernard", "Saluki", "Samoyed", "Schipperke", "Scottish Deerhound", "Scottish Terrier", "Australian Shepherd", "Shetland Sheepdog", "Shiba Inu", "Shih Tzu", "Shiloh Shepherd", 
-            "Siberian Husky", "Silky Terrier", "Australian Terrier", "Smooth Fox Terrier", "Soft Coated Wheaten Terrier", "Spanish Water Dog", "Spinone Italiano", "Staffordshire Bull Terrier", "Standard Schnauzer", 
-            "Azawakh", "Swedish Vallhund", "Thai Ridgeback", "Tibetan Mastiff", "Tibetan Spaniel", "Tibetan Terrier", "Toy Fox Terrier", "Barbet", "Treeing Walker Coonhound", "Vizsla", "Weimaraner", "Welsh Springer Spaniel", 
-            "Whippet", "West Highland White Terrier", "Akbash Dog", "White Shepherd", "Wire Fox Terrier", "Basenji", "Wirehaired Pointing Griffon", "Wirehaired Vizsla", "Xoloitzcuintli", "Yorkshire Terrier", 
-            "Basset Bleu de Gascogne", "African Hunting Dog", "Basset Hound", "Beagle", "Bearded Collie", "Beauceron", "Bedlington Terrier", "Belgian Malinois", "Belgian Tervuren", "Airedale Terrier", 
-            "Bernese Mountain Dog", "Bichon Frise", "Black and Tan Coonhound", "Bloodhound", "Bluetick Coonhound", "Boerboel", "Border Collie", "Border Terrier", "Boston Terrier", "Bouvier des Flandres", "Boxer", 
-            "Boykin Spaniel", "Bracco Italiano", "Briard", "Brittany", "Akita", "Bull Terrier", "Bullmastiff", "Cairn Terrier", "Cane Corso", "Cardigan Welsh Corgi", "Catahoula Leopard Dog", "Alapaha Blue Blood Bulldog", 
-            "Caucasian Shepherd (Ovcharka)", "Cavalier King Charles Spaniel", "Chesapeake Bay Retriever", "Chinese Crested", "Chinese Shar-Pei", "Alaskan Husky", "Chinook", "Chow Chow", "Clumber Spaniel", "Cocker Spaniel", 
-            "Cocker Spaniel (American)", "Coton de Tulear", "Alaskan Malamute", "Dalmatian", "Doberman Pinscher", "Dogo Argentino", "Dutch Shepherd", "Mix Breed"
-        }
-        
-        # Common cat breeds
-        self.cat_breeds: Set[str] = {
-            "American Bobtail", "Abyssinian", "American Curl", "Aegean", "Arabian Mau", "Australian Mist", "American Shorthair", "American Wirehair", "Balinese", "Bambino", "Bengal", 
-            "Birman", "Bombay", "British Shorthair", "British Longhair", "Burmese", "Burmilla", "Chartreux", "Chausie", "Cheetoh", "Cornish Rex", "Colorpoint Shorthair", "California Spangled", 
-            "Chantilly-Tiffany", "Cymric", "Cyprus", "Donskoy", "Devon Rex", "Siberian", "European Burmese", "Egyptian Mau", "Exotic Shorthair", "Havana Brown", "Himalayan", "Javanese", 
-            "Japanese Bobtail", "Khao Manee", "Korat", "Kurilian", "LaPerm", "Dragon Li", "Malayan", "Manx", "Maine Coon", "Mix Breed", "Munchkin", "Nebelung", "Norwegian Forest Cat", 
-            "Ocicat", "Oriental", "Persian", "Pixie-bob", "Ragamuffin", "Ragdoll", "Russian Blue", "Savannah", "Scottish Fold", "Siamese", "Singapura", "Snowshoe", "Somali", "Sphynx", 
-            "Selkirk Rex", "Turkish Angora", "Tonkinese", "Toyger", "Turkish Van", "York Chocolate"
-        }
+        self.dog_breeds: FrozenSet[str] = DOG_BREEDS
+        self.cat_breeds: FrozenSet[str] = CAT_BREEDS
+
+    def resolve_breed(self, breed: str, species: str) -> Optional[str]:
+        index: Optional[BreedIndex] = BREED_INDEX.get(str(species).lower().strip())
+        return index.resolve(breed) if index is not None else None
+
+    def suggest_breed(self, breed: str, species: str) -> Optional[str]:
+        index: Optional[BreedIndex] = BREED_INDEX.get(str(species).lower().strip())
+        return index.suggest(breed) if index is not None else None
 
     def validate_breed(self, breed: str, species: str) -> bool:
-        # Normalize the input breed and species
-        normalized_breed: str = breed.strip().title()  # Capitalize first letter of each word
-        normalized_species: str = species.lower().strip()
-        
-        # Create normalized breed sets
-        normalized_dog_breeds: Set[str] = {breed.title() for breed in self.dog_breeds}
-        normalized_cat_breeds: Set[str] = {breed.title() for breed in self.cat_breeds}
-        
-        if normalized_species == "dog":
-            return normalized_breed in normalized_dog_breeds
-        elif normalized_species == "cat":
-            return normalized_breed in normalized_cat_breeds
-        return False
+        return self.resolve_breed(breed, species) is not None
 
     def validate_numeric(self, value: str) -> bool:
         try:
@@ -62,21 +185,30 @@ class PetDataValidator:
 
     def validate_pet_data(self, pet_data: Dict) -> Dict:
         errors = []
-        
-        # Validate breed
-        if not self.validate_breed(pet_data.get('breed', ''), pet_data.get('species', '')):
-            errors.append(f"Invalid breed '{pet_data.get('breed', '')}' for {pet_data.get('species', '')}")
+        suggestions: Dict[str, str] = {}
+
+        # Validate breed, known aliases and spellings become the listed name
+        breed: Optional[str] = self.resolve_breed(pet_data.get('breed', ''), pet_data.get('species', ''))
+        if breed is None:
+            error: str = f"Invalid breed '{pet_data.get('breed', '')}' for {pet_data.get('species', '')}"
+            suggestion: Optional[str] = self.suggest_breed(pet_data.get('breed', ''), pet_data.get('species', ''))
+            if suggestion is not None:
+                error += f". Did you mean '{suggestion}'?"
+                suggestions['breed'] = suggestion
+            errors.append(error)
         
         # Validate age
         if not self.validate_numeric(str(pet_data.get('age', ''))):
             errors.append("Age must be a number")
             
-        # Validate weight
+        # Validate weight, calories can't be calculated without a real weight
         if not self.validate_numeric(str(pet_data.get('weight', ''))):
             errors.append("Weight must be a number")
+        elif float(pet_data.get('weight')) <= 0:
+            errors.append("Weight must be greater than 0")
         
         if errors:
-            raise PetValidationError("\n".join(errors))
+            raise PetValidationError("\n".join(errors), suggestions)
             
         
-        return pet_data
\ No newline at end of file
+        return {**pet_data, 'breed': breed}
\ No newline at end of file
@@ -1,11 +1,29 @@
-from fastapi import FastAPI
+import time
+
+# Start of the cold start: everything from here to the first request served
+_STARTED: float = time.perf_counter()
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
+from typing import AsyncIterator, Dict
+import asyncio
+import importlib.util
+import logging
+import signal
+import threading
 import uvicorn
 from dotenv import load_dotenv
 import os
-from routes.nutrition_routes import router as nutrition_router
 
+# Load .env before importing the routes, they read their settings at import
 load_dotenv()
 
+from llm_metrics import VALIDATION_FAILURES, render_metrics
+from routes.nutrition_routes import create_nutrition_llm, router as nutrition_router
+
 SSL_KEYFILE = os.getenv("SSL_KEYFILE")
 if not SSL_KEYFILE:
     raise ValueError("SSL_KEYFILE environment variable is not set!")
@@ -14,22 +32,138 @@ SSL_CERTFILE = os.getenv("SSL_CERTFILE")
 if not SSL_CERTFILE:
     raise ValueError("SSL_CERTFILE environment variable is not set!")
 
-app = FastAPI()
+# "development" runs a single process that reloads on code changes,
+# anything else is the production mode
+APP_ENV: str = os.getenv("APP_ENV", "production").strip().lower()
+# Worker processes in production; each has its own cache, admission limits
+# and Ollama connections
+WORKERS: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+# Seconds a shutdown waits for running generations before cancelling them
+GRACEFUL_SHUTDOWN_TIMEOUT: float = float(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "60"))
+# Loading the model into Ollama's memory can take tens of seconds; failed
+# warm-ups, e.g. Ollama still starting, are retried every few seconds
+WARMUP_TIMEOUT: float = float(os.getenv("OLLAMA_WARMUP_TIMEOUT", "300"))
+WARMUP_RETRY_SECONDS: float = 5.0
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def _event_loop() -> str:
+    # uvloop and httptools come with uvicorn[standard]
+    return os.getenv("UVICORN_LOOP") or ("uvloop" if importlib.util.find_spec("uvloop") else "asyncio")
+
+
+def _http_protocol() -> str:
+    return os.getenv("UVICORN_HTTP") or ("httptools" if importlib.util.find_spec("httptools") else "h11")
+
+
+async def _warm_up(app: FastAPI) -> None:
+    started: float = time.perf_counter()
+    while not await app.state.nutrition_llm.awarm_up(WARMUP_TIMEOUT):
+        logger.warning("Model warm-up failed, retrying in %.0f seconds", WARMUP_RETRY_SECONDS)
+        await asyncio.sleep(WARMUP_RETRY_SECONDS)
+    app.state.startup["warmupSeconds"] = time.perf_counter() - started
+    app.state.startup["readySeconds"] = time.perf_counter() - _STARTED
+    logger.info("Model resident, ready %.1f seconds after start", app.state.startup["readySeconds"])
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    started: float = time.perf_counter()
+    app.state.startup = {"importSeconds": started - _STARTED}
+    nutrition_llm = app.state.nutrition_llm = create_nutrition_llm()
+    app.state.startup["clientSeconds"] = time.perf_counter() - started
+    # Requests are served while the model loads, /ready tells load balancers
+    # when it is worth sending them
+    warm_up = asyncio.ensure_future(_warm_up(app))
+
+    # On SIGTERM uvicorn stops accepting connections and waits for the open
+    # ones; stop admitting generations right away as well, so requests still
+    # arriving on kept-alive connections are turned away with 503 instead
+    # of queueing behind the drain. uvicorn's own handler still runs.
+    if threading.current_thread() is threading.main_thread():
+        uvicorn_handler = signal.getsignal(signal.SIGTERM)
+
+        def drain_on_sigterm(signum, frame) -> None:
+            nutrition_llm.admission.start_drain()
+            if callable(uvicorn_handler):
+                uvicorn_handler(signum, frame)
+
+        signal.signal(signal.SIGTERM, drain_on_sigterm)
+
+    app.state.startup["startupSeconds"] = time.perf_counter() - _STARTED
+    yield
+
+    warm_up.cancel()
+    if not await nutrition_llm.admission.drain(GRACEFUL_SHUTDOWN_TIMEOUT):
+        logger.warning("Shutting down with %d meal plan generations still running", nutrition_llm.admission.in_flight)
+
+
+app = FastAPI(lifespan=lifespan)
 
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
 
+@app.get("/ready")
+async def ready(request: Request):
+    # 503 until the model is resident in Ollama's memory, with the time the
+    # start took so far
+    nutrition_llm = request.app.state.nutrition_llm
+    body: Dict = {
+        "ready": nutrition_llm.ready,
+        "startup": request.app.state.startup,
+        "backends": [
+            {"baseUrl": backend.base_url, "resident": backend.resident, "warmupSeconds": backend.warmup_seconds}
+            for backend in nutrition_llm.pool.backends
+        ],
+    }
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
+@app.get("/metrics")
+def metrics():
+    # Prometheus text format
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
+@app.exception_handler(RequestValidationError)
+async def validation_failed(request: Request, exc: RequestValidationError):
+    # Invalid request bodies are rejected before the meal plan code runs,
+    # count them with the pet data it rejects
+    VALIDATION_FAILURES.inc()
+    return await request_validation_exception_handler(request, exc)
+
 # Include nutrition routes
 app.include_router(nutrition_router)
 
 # Run the app with SSL
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0", 
-        port=8800,       
-        ssl_keyfile=SSL_KEYFILE,
-        ssl_certfile=SSL_CERTFILE,
-        reload=True      
-    )
\ No newline at end of file
+    if APP_ENV == "development":
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8800,
+            ssl_keyfile=SSL_KEYFILE,
+            ssl_certfile=SSL_CERTFILE,
+            reload=True
+        )
+    else:
+        # Every worker creates its own LLM client and warms the model up in
+        # its lifespan handler; the model is loaded by the first of them.
+        # With several workers the client is built once here first, so
+        # configuration errors stop the launch before any worker starts and
+        # the recipe library tables are created by one process only.
+        if WORKERS > 1:
+            create_nutrition_llm().recipe_library.engine.dispose()
+        uvicorn.run(
+            "main:app" if WORKERS > 1 else app,
+            host="0.0.0.0",
+            port=8800,
+            ssl_keyfile=SSL_KEYFILE,
+            ssl_certfile=SSL_CERTFILE,
+            workers=WORKERS,
+            loop=_event_loop(),
+            http=_http_protocol(),
+            timeout_graceful_shutdown=int(GRACEFUL_SHUTDOWN_TIMEOUT),
+            reload=False
+        )
@@ -0,0 +1,212 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
+import re
+from sqlalchemy import JSON, Column, Index, Text, UniqueConstraint, func, update
+from sqlalchemy.orm import aliased
+from sqlmodel import Field, Session, SQLModel, create_engine, select
+from breed_profiles import LARGE_BREED_PUPPY_MAX_YEARS
+from calorie_engine import health_flags, life_stage
+
+# Words in ingredient names that say nothing about the food itself
+INGREDIENT_STOPWORDS: Set[str] = {
+    "a", "an", "and", "of", "with", "the", "or", "in", "to", "for", "fresh", "cooked", "boiled", "raw",
+    "chopped", "diced", "sliced", "minced", "plain", "lean", "organic", "small", "large", "piece", "pieces",
+    "cup", "cups", "g", "gram", "grams", "kg", "oz", "tbsp", "tsp",
+}
+
+# Words of the health concerns that don't name a condition
+NO_CONCERN_WORDS: Set[str] = {"none", "no", "healthy", "known", "issue", "concern"}
+PROFILE_TAG_LENGTH: int = 128
+
+_WORD = re.compile(r"[a-z]+")
+
+
+def _singular(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith("oes"):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def ingredient_tokens(ingredients: Iterable[str]) -> Set[str]:
+    """Normalized words of the ingredient names, e.g. "Sweet Potatoes" -> {"sweet", "potato"}"""
+    tokens: Set[str] = set()
+    for ingredient in ingredients:
+        for word in _WORD.findall(str(ingredient).lower()):
+            if word not in INGREDIENT_STOPWORDS:
+                tokens.add(_singular(word))
+    return tokens
+
+
+def recipe_name_key(name: str) -> str:
+    return " ".join(_WORD.findall(str(name).lower()))
+
+
+def profile_tags(pet_data: Dict, breed_profile: Dict) -> Dict[str, Any]:
+    """Profile of the pet a recipe is generated for, stored with the recipe;
+    it is only served to pets with the same profile"""
+    species: str = str(pet_data["species"]).strip().lower()
+    age: float = float(pet_data["age"])
+    stage: str = life_stage(species, age)
+    if species == "dog" and breed_profile["sizeClass"] in ("large", "giant") and age < LARGE_BREED_PUPPY_MAX_YEARS:
+        stage = "large breed puppy"
+    concerns: str = str(pet_data.get("health_concerns") or "")
+    # The words health_flags doesn't cover, e.g. "Overweight, kidney
+    # disease" -> flags HEALTH_OVERWEIGHT and "disease kidney"
+    other_concerns: List[str] = sorted(
+        word for word in ingredient_tokens([concerns]) if word not in NO_CONCERN_WORDS and not health_flags(word)
+    )
+    return {
+        "life_stage": stage,
+        "health_flags": health_flags(concerns),
+        "sensitivities": ";".join(breed_profile["sensitivities"])[:PROFILE_TAG_LENGTH],
+        "health_concerns": " ".join(other_concerns)[:PROFILE_TAG_LENGTH],
+    }
+
+
+class Recipe(SQLModel, table=True):
+    __tablename__ = "recipes"
+    # Titles are unique per species and profile, the constraint's index also
+    # serves the lookups by profile
+    __table_args__ = (UniqueConstraint(
+        "species", "life_stage", "health_flags", "sensitivities", "health_concerns", "name_key",
+        name="uq_recipes_profile_name_key"
+    ),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    species: str = Field(max_length=16, index=True)
+    recipe_name: str = Field(max_length=255)
+    # Lower-cased title without punctuation, recipes are unique per species on it
+    name_key: str = Field(max_length=255)
+    ingredients: List[str] = Field(sa_column=Column(JSON, nullable=False))
+    preparation: List[str] = Field(sa_column=Column(JSON, nullable=False))
+    description: str = Field(sa_column=Column(Text, nullable=False))
+    # Tags of the pet profile the recipe was generated for, see profile_tags
+    life_stage: str = Field(default="adult", max_length=32)
+    health_flags: int = Field(default=0)
+    sensitivities: str = Field(default="", max_length=PROFILE_TAG_LENGTH)
+    health_concerns: str = Field(default="", max_length=PROFILE_TAG_LENGTH)
+    times_served: int = Field(default=0)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class RecipeIngredient(SQLModel, table=True):
+    """One row per normalized ingredient token of a recipe"""
+
+    __tablename__ = "recipe_ingredients"
+    __table_args__ = (Index("ix_recipe_ingredients_species_token", "species", "token"),)
+
+    recipe_id: int = Field(foreign_key="recipes.id", primary_key=True)
+    token: str = Field(max_length=64, primary_key=True)
+    species: str = Field(max_length=16)
+
+
+class RecipeLibrary:
+    """Generated recipes, stored so later meal plans can reuse them"""
+
+    def __init__(self, database_url: str = "sqlite:///recipes.db"):
+        connect_args: Dict = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+        self.engine = create_engine(database_url, connect_args=connect_args, pool_pre_ping=True)
+        SQLModel.metadata.create_all(self.engine, tables=[Recipe.__table__, RecipeIngredient.__table__])
+
+    def add(self, species: str, recipes: List[Dict], tags: Optional[Dict[str, Any]] = None) -> int:
+        # Stores the recipes that aren't in the library yet for the profile,
+        # returns how many
+        species = species.strip().lower()
+        tags = tags or {}
+        added: int = 0
+        keys: List[str] = [recipe_name_key(recipe["recipeName"]) for recipe in recipes]
+        with Session(self.engine) as session:
+            seen: Set[str] = set(session.exec(
+                select(Recipe.name_key)
+                .where(Recipe.species == species, Recipe.name_key.in_(sorted(set(keys))), *self._profile(tags))
+            ).all())
+            for recipe, name_key in zip(recipes, keys):
+                if name_key in seen or not name_key:
+                    continue
+                seen.add(name_key)
+                row = Recipe(
+                    species=species,
+                    recipe_name=recipe["recipeName"],
+                    name_key=name_key,
+                    ingredients=list(recipe["ingredients"]),
+                    preparation=list(recipe["preparation"]),
+                    description=recipe["description"],
+                    **tags,
+                )
+                session.add(row)
+                session.flush()
+                for token in ingredient_tokens(recipe["ingredients"]):
+                    session.add(RecipeIngredient(recipe_id=row.id, token=token[:64], species=species))
+                added += 1
+            session.commit()
+        return added
+
+    def find(self, species: str, ingredients: Optional[Iterable[str]] = None,
+             exclude_titles: Optional[Iterable[str]] = None, limit: int = 2,
+             tags: Optional[Dict[str, Any]] = None, avoid: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Recipes for the species, the ones sharing the most ingredient
+        tokens with the given ingredients first, then the least served.
+        With tags only recipes generated for that profile are returned, and
+        none with an ingredient named in avoid, e.g. the health concerns."""
+        species = species.strip().lower()
+        tokens: Set[str] = ingredient_tokens(ingredients or [])
+        excluded: Set[str] = {recipe_name_key(title) for title in exclude_titles or []}
+        avoided: Set[str] = ingredient_tokens(avoid or [])
+
+        with Session(self.engine) as session:
+            if tokens:
+                matches = func.count(RecipeIngredient.token).label("matches")
+                query = (
+                    select(Recipe)
+                    .join(RecipeIngredient, RecipeIngredient.recipe_id == Recipe.id)
+                    .where(RecipeIngredient.species == species, RecipeIngredient.token.in_(sorted(tokens)))
+                    .group_by(Recipe.id)
+                    .order_by(matches.desc(), Recipe.times_served, Recipe.id.desc())
+                )
+            else:
+                query = (
+                    select(Recipe)
+                    .where(Recipe.species == species)
+                    .order_by(Recipe.times_served, Recipe.id.desc())
+                )
+            if tags:
+                query = query.where(Recipe.species == species, *self._profile(tags))
+            if excluded:
+                query = query.where(Recipe.name_key.not_in(sorted(excluded)))
+            if avoided:
+                avoided_ingredient = aliased(RecipeIngredient)
+                query = query.where(Recipe.id.not_in(
+                    select(avoided_ingredient.recipe_id)
+                    .where(avoided_ingredient.species == species, avoided_ingredient.token.in_(sorted(avoided)))
+                ))
+            rows: List[Recipe] = list(session.exec(query.limit(limit)).all())
+            return [self._to_response(row) for row in rows]
+
+    def mark_served(self, species: str, titles: Iterable[str], tags: Optional[Dict[str, Any]] = None) -> None:
+        # Served recipes move behind the others, so pets with the same
+        # profile don't all get the same two
+        keys: List[str] = sorted({recipe_name_key(title) for title in titles})
+        if not keys:
+            return
+        with Session(self.engine) as session:
+            session.execute(
+                update(Recipe)
+                .where(Recipe.species == species.strip().lower(), Recipe.name_key.in_(keys), *self._profile(tags or {}))
+                .values(times_served=Recipe.times_served + 1)
+            )
+            session.commit()
+
+    def _profile(self, tags: Dict[str, Any]) -> List:
+        return [getattr(Recipe, name) == value for name, value in tags.items()]
+
+    def _to_response(self, row: Recipe) -> Dict:
+        return {
+            "recipeName": row.recipe_name,
+            "ingredients": list(row.ingredients),
+            "preparation": list(row.preparation),
+            "description": row.description,
+        }
@@ -0,0 +1,92 @@
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+from recipe_library import ingredient_tokens, recipe_name_key
+
+# Saved titles shown in the prompt; the rest are only checked after generation
+TITLES_IN_PROMPT: int = 8
+# Trigram similarity above which two titles count as the same recipe
+TITLE_SIMILARITY: float = 0.75
+
+
+def _title_tokens(title: str) -> FrozenSet[str]:
+    # Word order, case, punctuation, plurals and filler words don't make a
+    # different recipe: "Rice & Chicken Bowls" is "Chicken and Rice Bowl"
+    return frozenset(ingredient_tokens([title]))
+
+
+def _trigrams(tokens: FrozenSet[str]) -> Set[str]:
+    text: str = f" {' '.join(sorted(tokens))} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class RecipeTitleIndex:
+    """Normalized index of a user's saved recipe titles"""
+
+    def __init__(self, titles: Iterable[str] = ()):
+        self.titles: List[str] = []
+        self._keys: Dict[str, int] = {}
+        self._token_sets: Dict[FrozenSet[str], int] = {}
+        self._trigrams: List[Set[str]] = []
+        self._token_postings: Dict[str, List[int]] = {}
+        self._trigram_postings: Dict[str, List[int]] = {}
+        for title in titles:
+            self.add(title)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def add(self, title: str) -> None:
+        key: str = recipe_name_key(title)
+        if not key or key in self._keys:
+            return
+        position: int = len(self.titles)
+        tokens: FrozenSet[str] = _title_tokens(title)
+        grams: Set[str] = _trigrams(tokens)
+        self.titles.append(title)
+        self._keys[key] = position
+        self._token_sets.setdefault(tokens, position)
+        self._trigrams.append(grams)
+        for token in tokens:
+            self._token_postings.setdefault(token, []).append(position)
+        for gram in grams:
+            self._trigram_postings.setdefault(gram, []).append(position)
+
+    def copy(self) -> "RecipeTitleIndex":
+        return RecipeTitleIndex(self.titles)
+
+    def collision(self, title: str) -> Optional[str]:
+        """The saved title this one duplicates, if any"""
+        key: str = recipe_name_key(title)
+        if key in self._keys:
+            return self.titles[self._keys[key]]
+        tokens: FrozenSet[str] = _title_tokens(title)
+        if tokens in self._token_sets:
+            return self.titles[self._token_sets[tokens]]
+
+        # Near duplicates, e.g. an extra word or a spelling variant
+        grams: Set[str] = _trigrams(tokens)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for position in self._trigram_postings.get(gram, ()):
+                shared[position] = shared.get(position, 0) + 1
+        best: Optional[int] = None
+        best_similarity: float = TITLE_SIMILARITY
+        for position, count in shared.items():
+            similarity: float = count / (len(grams) + len(self._trigrams[position]) - count)
+            if similarity >= best_similarity:
+                best, best_similarity = position, similarity
+        return self.titles[best] if best is not None else None
+
+    def similar(self, words: Iterable[str], limit: int = TITLES_IN_PROMPT) -> List[str]:
+        """Up to limit titles sharing the most words with the given ones,
+        topped up with the most recently saved titles"""
+        shared: Dict[int, int] = {}
+        for token in ingredient_tokens(words):
+            for position in self._token_postings.get(token, ()):
+                shared[position] = shared.get(position, 0) + 1
+        positions: List[int] = sorted(shared, key=lambda position: (-shared[position], -position))[:limit]
+        for position in range(len(self.titles) - 1, -1, -1):
+            if len(positions) >= limit:
+                break
+            if position not in shared:
+                positions.append(position)
+        return [self.titles[position] for position in positions]
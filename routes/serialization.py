@@ -0,0 +1,77 @@
+from fastapi import Response
+from typing import Any, Callable, Optional, Tuple
+import msgpack
+import numpy as np
+import orjson
+
+# Response bodies are encoded straight to bytes, without FastAPI's
+# jsonable_encoder pass. JSON is the default; clients sending
+# "Accept: application/msgpack" get MessagePack instead.
+JSON_MEDIA_TYPE: str = "application/json"
+NDJSON_MEDIA_TYPE: str = "application/x-ndjson"
+MSGPACK_MEDIA_TYPE: str = "application/msgpack"
+MSGPACK_MEDIA_TYPES: Tuple[str, ...] = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+
+_ORJSON_OPTIONS: int = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _msgpack_default(value: Any) -> Any:
+    # Types orjson encodes natively but msgpack doesn't
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def encode_json(content: Any) -> bytes:
+    return orjson.dumps(content, option=_ORJSON_OPTIONS)
+
+
+def encode_json_line(content: Any) -> bytes:
+    return orjson.dumps(content, option=_ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+
+
+def encode_msgpack(content: Any) -> bytes:
+    return msgpack.packb(content, use_bin_type=True, default=_msgpack_default)
+
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    """Whether the Accept header prefers MessagePack over JSON"""
+    if not accept:
+        return False
+    msgpack_quality: float = 0.0
+    json_quality: float = 0.0
+    for media_range in accept.split(","):
+        media_type, _, params = media_range.partition(";")
+        media_type = media_type.strip().lower()
+        quality: float = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type in MSGPACK_MEDIA_TYPES:
+            msgpack_quality = max(msgpack_quality, quality)
+        elif media_type in (JSON_MEDIA_TYPE, "application/*", "*/*", NDJSON_MEDIA_TYPE):
+            json_quality = max(json_quality, quality)
+    # Ties go to msgpack, a client only lists it when it can read it
+    return msgpack_quality > 0 and msgpack_quality >= json_quality
+
+
+def negotiated_response(content: Any, accept: Optional[str], status_code: int = 200) -> Response:
+    if wants_msgpack(accept):
+        return Response(encode_msgpack(content), status_code=status_code, media_type=MSGPACK_MEDIA_TYPE)
+    return Response(encode_json(content), status_code=status_code, media_type=JSON_MEDIA_TYPE)
+
+
+def stream_encoder(accept: Optional[str]) -> Tuple[str, Callable[[Any], bytes]]:
+    """Media type and item encoder of a streamed response: NDJSON lines, or
+    concatenated MessagePack objects, which are self-delimiting"""
+    if wants_msgpack(accept):
+        return MSGPACK_MEDIA_TYPE, encode_msgpack
+    return NDJSON_MEDIA_TYPE, encode_json_line
@@ -0,0 +1,59 @@
+from typing import Any
+
+import orjson
+import pytest
+
+from llm_repair import repair_json
+from tests.test_llm_stream import ANSWER, PLAN
+
+
+def _is_prefix(partial: Any, full: Any) -> bool:
+    # A cut-off value keeps whole members and items only, except for the
+    # last one, which may itself be a cut-off object or array
+    if isinstance(full, dict):
+        keys: list = list(partial) if isinstance(partial, dict) else None
+        if keys is None or keys != list(full)[:len(keys)]:
+            return False
+        return not keys or (
+            all(partial[key] == full[key] for key in keys[:-1]) and _is_prefix(partial[keys[-1]], full[keys[-1]])
+        )
+    if isinstance(full, list):
+        if not isinstance(partial, list) or len(partial) > len(full):
+            return False
+        return not partial or (
+            partial[:-1] == full[:len(partial) - 1] and _is_prefix(partial[-1], full[len(partial) - 1])
+        )
+    return partial == full
+
+
+def test_complete_answer():
+    assert repair_json(ANSWER) == PLAN
+
+
+@pytest.mark.parametrize("end", range(len(ANSWER) + 1))
+def test_truncation_at_every_offset(end: int):
+    assert _is_prefix(repair_json(ANSWER[:end]), PLAN)
+
+
+@pytest.mark.parametrize("text, repaired", [
+    ('', {}),
+    ('no json here', {}),
+    ('{"warnings": [', {"warnings": []}),
+    ('{"warnings": [], "supplements": [', {"warnings": [], "supplements": []}),
+    # Cut inside an escape, a string or right after a key: the value is dropped
+    ('{"raw": true, "note": "a \\', {"raw": True}),
+    ('{"raw": true, "note": "half a sente', {"raw": True}),
+    ('{"raw": true, "note":', {"raw": True}),
+    # A number may go on, it is only kept once something follows it
+    ('{"servings": 12', {}),
+    ('{"servings": 12 ', {"servings": 12}),
+    ('{"ingredients": [{"recipeName": "Stew", "preparation": ["Boil"', {"ingredients": [{"recipeName": "Stew", "preparation": ["Boil"]}]}),
+])
+def test_repairs(text: str, repaired: dict):
+    assert repair_json(text) == repaired
+
+
+def test_repaired_text_is_valid_json():
+    # Every prefix closes into an object orjson accepts again as it is
+    for end in range(len(ANSWER) + 1):
+        assert isinstance(orjson.loads(orjson.dumps(repair_json(ANSWER[:end]))), dict)
@@ -0,0 +1,74 @@
+import orjson
+import pytest
+
+from llm_stream import JSONSectionStream
+
+# Strings with escapes, quotes and brackets the parser must not take for
+# structure, top-level arrays with and without items and every scalar type
+ANSWER: str = (
+    '```json\n{"caloricIntake": "1000 kcal \\"per day\\"", '
+    '"ingredients": [{"recipeName": "Chicken {and} Rice [bowl]", "preparation": ["Boil, then cool\\\\", "Serve"]}, '
+    '{"recipeName": "Caf\\u00e9 \\/ Fish\\n", "preparation": []}], '
+    '"warnings": [], "supplements": [ ], "foodsToAvoid": ["Grapes", "Onions"], '
+    '"servings": 2.5e1, "raw": true, "note": null, '
+    '"mealPlan": {"breakfast": "Kibble, ]wet} food"}}\n```'
+)
+PLAN: dict = orjson.loads(ANSWER[ANSWER.index("{"):ANSWER.rindex("}") + 1])
+
+
+def _feed(chunks) -> list:
+    parser = JSONSectionStream()
+    sections: list = []
+    for chunk in chunks:
+        sections.extend(parser.feed(chunk))
+    return sections
+
+
+def _assemble(sections: list) -> dict:
+    # The meal plan the sections add up to, as llm.py builds it
+    plan: dict = {}
+    for section, value in sections:
+        if section.endswith("]"):
+            plan.setdefault(section[:section.index("[")], []).append(value)
+        else:
+            plan[section] = value
+    return plan
+
+
+EXPECTED: list = _feed([ANSWER])
+
+
+def test_sections_add_up_to_the_answer():
+    assert _assemble(EXPECTED) == PLAN
+    assert [section for section, _ in EXPECTED] == [
+        "caloricIntake", "ingredients[0]", "ingredients[1]", "warnings", "supplements",
+        "foodsToAvoid[0]", "foodsToAvoid[1]", "servings", "raw", "note", "mealPlan",
+    ]
+
+
+def test_empty_top_level_arrays_are_emitted():
+    assert _feed(['{"warnings": [], "supplements": [ \n], "foodsToAvoid": ["Grapes"]}']) == [
+        ("warnings", []), ("supplements", []), ("foodsToAvoid[0]", "Grapes"),
+    ]
+
+
+@pytest.mark.parametrize("split", range(len(ANSWER) + 1))
+def test_every_split_point(split: int):
+    assert _feed([ANSWER[:split], ANSWER[split:]]) == EXPECTED
+
+
+def test_one_character_at_a_time():
+    assert _feed(ANSWER) == EXPECTED
+
+
+@pytest.mark.parametrize("end", range(len(ANSWER) + 1))
+def test_truncated_answer_only_emits_complete_values(end: int):
+    # Whatever is emitted before the cut is exactly what the full answer has
+    sections: list = _feed([ANSWER[:end]])
+    assert sections == EXPECTED[:len(sections)]
+
+
+def test_stops_at_the_end_of_the_root_object():
+    parser = JSONSectionStream()
+    assert parser.feed('{"raw": false} {"raw": true}') == [("raw", False)]
+    assert parser.done